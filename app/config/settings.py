@@ -1,82 +1,141 @@
 import os
+from functools import lru_cache
 from pathlib import Path
+from typing import Annotated
+
 from dotenv import load_dotenv
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 ENV_PATH = BASE_DIR / ".env"
 
+# Container deployments (Docker/K8s) get their env from the orchestrator and set
+# RUNNING_IN_CONTAINER=1, so the .env file is never touched there. Checked once at import.
+_USE_DOTENV = os.getenv("RUNNING_IN_CONTAINER") != "1" and ENV_PATH.exists()
+
+# Set once .env has been merged into os.environ, so later Settings() calls skip the file
+_DOTENV_LOADED = False
+
+
+def _ensure_env_loaded() -> None:
+    # One-shot per process; runs lazily so Uvicorn's child processes load it too
+    global _DOTENV_LOADED
+    if _DOTENV_LOADED:
+        return
+    if _USE_DOTENV:
+        load_dotenv(dotenv_path=ENV_PATH, override=False)
+    _DOTENV_LOADED = True
+
+
+RequiredStr = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]
+
+
+class _EnvironmentSchema(BaseModel):
+    """Raw environment contract; its validator is compiled once at import and run per Settings()."""
+    model_config = ConfigDict(extra="ignore", str_strip_whitespace=True)
+
+    MONGO_URI: RequiredStr
+    DATABASE_NAME: RequiredStr
+    MONGO_MIN_POOL_SIZE: int = Field(10, ge=0)
+    MONGO_MAX_POOL_SIZE: int = Field(50, gt=0)
+    MONGO_MAX_IDLE_TIME_MS: int = 60000
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 2500
+
+    USER_PROFILES_COLLECTION: RequiredStr
+    APPLICATION_COLLECTION: RequiredStr
+    JOB_COLLECTION: RequiredStr
+
+    AZURE_OPENAI_API_KEY: RequiredStr
+    AZURE_OPENAI_ENDPOINT: RequiredStr
+    AZURE_OPENAI_API_VERSION: RequiredStr = "2024-02-15"
+    AZURE_OPENAI_EMBEDDING_DEPLOYMENT: RequiredStr
+
+    # Must be 3072 for the specified Azure OpenAI embedding model
+    EMBEDDING_DIMENSIONS: int = Field(ge=3072, le=3072)
+    RATE_LIMIT_REQUESTS_PER_MINUTE: int = Field(60, gt=0)
+    COST_THRESHOLD: float = Field(ge=0)
+
+    # Vector search index name for userprofiles collection
+    USERPROFILE_VECTOR_INDEX: RequiredStr = "userprofiles_embedding_index"
 
-# If MongoDB is missing it shall not start the application
+    # Seconds a ranked search result is reused for the same JD embedding; 0 disables the cache
+    SEARCH_RESULT_CACHE_TTL_SECONDS: float = Field(0, ge=0)
+
+
+# If MongoDB is missing it shall not start the application.
+# Values come from os.environ; a local .env fills in only keys that are not already set,
+# and is skipped entirely when RUNNING_IN_CONTAINER=1.
 class Settings:
-    # Read MONGO_URI, DATABASE_NAME, MONGO_CANDIDATE_COLLECTIONS from environment.
+    # Fixed attribute set: no per-instance __dict__ and faster attribute reads on hot paths
+    __slots__ = (
+        "MONGO_URI",
+        "DATABASE_NAME",
+        "MONGO_MIN_POOL_SIZE",
+        "MONGO_MAX_POOL_SIZE",
+        "MONGO_MAX_IDLE_TIME_MS",
+        "MONGO_WAIT_QUEUE_TIMEOUT_MS",
+        "USER_PROFILES_COLLECTION",
+        "APPLICATION_COLLECTION",
+        "JOB_COLLECTION",
+        "AZURE_OPENAI_API_KEY",
+        "AZURE_OPENAI_ENDPOINT",
+        "AZURE_OPENAI_API_VERSION",
+        "AZURE_OPENAI_EMBEDDING_DEPLOYMENT",
+        "EMBEDDING_VECTOR_SIZE",
+        "RATE_LIMIT_REQUESTS_PER_MINUTE",
+        "COST_THRESHOLD",
+        "DEFAULT_APPLIED_PAGE_SIZE",
+        "MAX_APPLIED_PAGE_SIZE",
+        "DEFAULT_GLOBAL_LIMIT",
+        "MAX_GLOBAL_LIMIT",
+        "USERPROFILE_VECTOR_INDEX",
+        "SEARCH_RESULT_CACHE_TTL_SECONDS",
+    )
+
+    # Read MONGO_URI, DATABASE_NAME, collection names, Azure OpenAI and limits from environment.
+    # Invalid or missing values raise pydantic's ValidationError (a ValueError).
     def __init__(self):
-        # Load .env in __init__ to ensure it works in Uvicorn's child processes
-        if not ENV_PATH.exists():
-            raise FileNotFoundError(f".env file not found at: {ENV_PATH}")
-        load_dotenv(dotenv_path=ENV_PATH, override=True)
-
-
-        self.MONGO_URI = os.environ.get("MONGO_URI", "").strip()
-        if not self.MONGO_URI:
-            raise ValueError("MONGO_URI environment variable is not set.")
-        
-        self.DATABASE_NAME = os.environ.get("DATABASE_NAME", "").strip()
-        if not self.DATABASE_NAME:
-            raise ValueError("DATABASE_NAME environment variable is not set.")
-        
-
-        self.USER_PROFILES_COLLECTION = os.environ.get("USER_PROFILES_COLLECTION", "").strip()
-        self.APPLICATION_COLLECTION = os.environ.get("APPLICATION_COLLECTION", "").strip()
-        self.JOB_COLLECTION = os.environ.get("JOB_COLLECTION", "").strip()
-
-        if not all([self.USER_PROFILES_COLLECTION, self.APPLICATION_COLLECTION, self.JOB_COLLECTION]):
-            raise ValueError("One or more required collection names are not set in environment variables.")
-        
-
-
-        self.AZURE_OPENAI_API_KEY = os.environ.get("AZURE_OPENAI_API_KEY", "").strip()
-        self.AZURE_OPENAI_ENDPOINT = os.environ.get("AZURE_OPENAI_ENDPOINT", "").strip()
-        self.AZURE_OPENAI_API_VERSION = os.environ.get("AZURE_OPENAI_API_VERSION", "2024-02-15").strip()
-        self.AZURE_OPENAI_EMBEDDING_DEPLOYMENT = os.environ.get("AZURE_OPENAI_EMBEDDING_DEPLOYMENT", "").strip()
-
-        for attr, value in{
-            "AZURE_OPENAI_API_KEY": self.AZURE_OPENAI_API_KEY,
-            "AZURE_OPENAI_ENDPOINT": self.AZURE_OPENAI_ENDPOINT,
-            "AZURE_OPENAI_API_VERSION": self.AZURE_OPENAI_API_VERSION,
-            "AZURE_OPENAI_EMBEDDING_DEPLOYMENT": self.AZURE_OPENAI_EMBEDDING_DEPLOYMENT
-        }.items():
-            if not value:
-                raise ValueError(f"{attr} environment variable is not set.")
-            
-
-        dim_raw = os.environ.get("EMBEDDING_DIMENSIONS", "").strip()
-        if not dim_raw:
-            raise ValueError("EMBEDDING_DIMENSION environment variable is not set.")
-        
-        self.EMBEDDING_VECTOR_SIZE = int(dim_raw)
-        if self.EMBEDDING_VECTOR_SIZE != 3072:
-            raise ValueError("EMBEDDING_DIMENSION_RAW must be 3072 for the specified Azure OpenAI embedding model.")
-        
-
-        rate_raw = os.environ.get("RATE_LIMIT_REQUESTS_PER_MINUTE", "60").strip()
-        self.RATE_LIMIT_REQUESTS_PER_MINUTE = int(rate_raw)
-        if self.RATE_LIMIT_REQUESTS_PER_MINUTE <= 0:
-            raise ValueError("RATE_LIMIT_REQUESTS_PER_MINUTE must be a positive integer.")
-        
-        cost_raw = os.environ.get("COST_THRESHOLD", "").strip()
-        if not cost_raw:
-            raise ValueError("COST_THRESHOLD environment variable is not set.")
-        self.COST_THRESHOLD = float(cost_raw)
-        if self.COST_THRESHOLD < 0:
-            raise ValueError("COST_THRESHOLD must be a positive number.")
-        
+        _ensure_env_loaded()
+
+        env = _EnvironmentSchema.model_validate(
+            {name: os.environ[name] for name in _EnvironmentSchema.model_fields if name in os.environ}
+        )
+
+        self.MONGO_URI = env.MONGO_URI
+        self.DATABASE_NAME = env.DATABASE_NAME
+
+        # Connection pool sizing; minPoolSize sockets are opened eagerly at startup
+        self.MONGO_MIN_POOL_SIZE = env.MONGO_MIN_POOL_SIZE
+        self.MONGO_MAX_POOL_SIZE = env.MONGO_MAX_POOL_SIZE
+        self.MONGO_MAX_IDLE_TIME_MS = env.MONGO_MAX_IDLE_TIME_MS
+        self.MONGO_WAIT_QUEUE_TIMEOUT_MS = env.MONGO_WAIT_QUEUE_TIMEOUT_MS
+        if self.MONGO_MIN_POOL_SIZE > self.MONGO_MAX_POOL_SIZE:
+            raise ValueError("MONGO_MIN_POOL_SIZE must not exceed MONGO_MAX_POOL_SIZE.")
+
+        self.USER_PROFILES_COLLECTION = env.USER_PROFILES_COLLECTION
+        self.APPLICATION_COLLECTION = env.APPLICATION_COLLECTION
+        self.JOB_COLLECTION = env.JOB_COLLECTION
+
+        self.AZURE_OPENAI_API_KEY = env.AZURE_OPENAI_API_KEY
+        self.AZURE_OPENAI_ENDPOINT = env.AZURE_OPENAI_ENDPOINT
+        self.AZURE_OPENAI_API_VERSION = env.AZURE_OPENAI_API_VERSION
+        self.AZURE_OPENAI_EMBEDDING_DEPLOYMENT = env.AZURE_OPENAI_EMBEDDING_DEPLOYMENT
+
+        self.EMBEDDING_VECTOR_SIZE = env.EMBEDDING_DIMENSIONS
+        self.RATE_LIMIT_REQUESTS_PER_MINUTE = env.RATE_LIMIT_REQUESTS_PER_MINUTE
+        self.COST_THRESHOLD = env.COST_THRESHOLD
 
         self.DEFAULT_APPLIED_PAGE_SIZE = 50
         self.MAX_APPLIED_PAGE_SIZE = 200
         self.DEFAULT_GLOBAL_LIMIT = 50
         self.MAX_GLOBAL_LIMIT = 200
-        
-        # Vector search index name for userprofiles collection
-        self.USERPROFILE_VECTOR_INDEX = os.environ.get("USERPROFILE_VECTOR_INDEX", "userprofiles_embedding_index").strip()
-        
+
+        self.USERPROFILE_VECTOR_INDEX = env.USERPROFILE_VECTOR_INDEX
+        self.SEARCH_RESULT_CACHE_TTL_SECONDS = env.SEARCH_RESULT_CACHE_TTL_SECONDS
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    # One Settings instance per process; also usable as a FastAPI dependency
+    return Settings()
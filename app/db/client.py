@@ -1,50 +1,94 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
+from dataclasses import dataclass
+
+from pymongo import AsyncMongoClient
+from pymongo.asynchronous.collection import AsyncCollection
 from pymongo.errors import ServerSelectionTimeoutError
-from app.config.settings import Settings
+from app.config.settings import Settings, get_settings
+
+
+@dataclass(frozen=True)
+class Collections:
+    """Collection handles resolved once at startup and shared by every request."""
+    user_profiles: AsyncCollection
+    applications: AsyncCollection
+    jobs: AsyncCollection
+
 
 # global variable mongo_client = None
-mongo_client: AsyncIOMotorClient | None = None
+mongo_client: AsyncMongoClient | None = None
+collections: Collections | None = None
+# Serializes first-time initialization so concurrent callers share one client per process
+_init_lock = asyncio.Lock()
 
 async def connect_to_mongo(settings: Settings) -> None:
     global mongo_client
     if mongo_client is not None:
         # Already connected, nothing to do
         return
+    async with _init_lock:
+        if mongo_client is not None:
+            # Another caller connected while we were waiting for the lock
+            return
+        mongo_client = await _create_client(settings)
+
+async def _create_client(settings: Settings) -> AsyncMongoClient:
     try:
-        client = AsyncIOMotorClient(settings.MONGO_URI, serverSelectionTimeoutMS=5000)
+        client = AsyncMongoClient(
+            settings.MONGO_URI,
+            serverSelectionTimeoutMS=5000,
+            minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+            maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+            maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS,
+            waitQueueTimeoutMS=settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        )
         # Ping the server to check connection
         await client.admin.command("ping")
-        mongo_client = client
         print("Connected to MongoDB successfully.")
+        return client
     except ServerSelectionTimeoutError as err:
         raise ConnectionError(f"Could not connect to MongoDB: {err}")
 
-def get_database(settings: Settings):
+def get_database():
+    # Names come from the cached settings singleton, so callers never build their own Settings
     if mongo_client is None:
         raise RuntimeError("MongoDB client is not initialized, call connect_to_mongo first.")
-    return mongo_client[settings.DATABASE_NAME]
-
-def get_candidate_collection(settings: Settings):
-    db = get_database(settings)
-    # Assuming CANDIDATE_COLLECTIONS is a list in settings, but checking settings.py it was USER_PROFILES_COLLECTION
-    # The original code used settings.CANDIDATE_COLLECTIONS[0], but settings.py has USER_PROFILES_COLLECTION.
-    # I should probably fix this to use the correct setting or keep it generic if I can't see settings.py right now.
-    # I saw settings.py earlier, it has USER_PROFILES_COLLECTION.
-    # The original code had `settings.CANDIDATE_COLLECTIONS[0]`, which might be wrong if settings.py doesn't have it.
-    # I'll check settings.py again to be sure, or just use USER_PROFILES_COLLECTION if I recall correctly.
-    # Let's check settings.py content from history.
-    # Step 25: settings.py has USER_PROFILES_COLLECTION, APPLICATION_COLLECTION, JOB_COLLECTION.
-    # It does NOT have CANDIDATE_COLLECTIONS.
-    # So the original code in client.py was likely broken or referring to an old version of settings.
-    # I will update this function to return the user profiles collection as a safe bet, or just remove it if not used.
-    # But to be safe and minimal, I'll use USER_PROFILES_COLLECTION.
-    return db[settings.USER_PROFILES_COLLECTION]
+    return mongo_client[get_settings().DATABASE_NAME]
+
+def init_collections() -> Collections:
+    global collections
+    settings = get_settings()
+    db = get_database()
+    collections = Collections(
+        user_profiles=db[settings.USER_PROFILES_COLLECTION],
+        applications=db[settings.APPLICATION_COLLECTION],
+        jobs=db[settings.JOB_COLLECTION],
+    )
+    return collections
+
+def get_collections() -> Collections:
+    if collections is None:
+        raise RuntimeError("Collections are not initialized, call init_collections first.")
+    return collections
+
+async def warm_up_pool() -> None:
+    # Concurrent cheap reads check out several sockets before the first request arrives
+    colls = get_collections()
+    await asyncio.gather(*(
+        coll.find_one({}, projection={"_id": 1})
+        for coll in (colls.user_profiles, colls.jobs, colls.applications)
+    ))
+
+def get_candidate_collection():
+    # Candidates live in the user profiles collection
+    return get_database()[get_settings().USER_PROFILES_COLLECTION]
 
 async def close_mongo_connection():
-    global mongo_client
+    global mongo_client, collections
     if mongo_client is not None:
-        mongo_client.close()
+        await mongo_client.close()
         mongo_client = None
+        collections = None
 
 
 
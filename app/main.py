@@ -4,32 +4,58 @@
 #Expose at least a health route to test everything wires correctly
 #In future include candidate/search/feedback routes and middlewares.
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from app.config.settings import Settings
-from app.db.client import connect_to_mongo , close_mongo_connection
-from fastapi.responses import JSONResponse
-#import uvicorn
+from app.config.settings import get_settings
+from app.db.client import connect_to_mongo , close_mongo_connection, init_collections, warm_up_pool
+from app.services.embedding_service import EmbeddingService, close_azure_client
+from app.services.job_listing_service import JobListingService
+from app.services.search_service import SearchService
 from app.routes import health
 from app.routes.search_candidates_routes import router as search_router
 
-# function create_app(): settings = Settings()  # from app.config.settings
+# function create_app(): settings = get_settings()  # cached, from app.config.settings
 def create_app() -> FastAPI:
-    settings = Settings()  # from app.config.settings
-    app = FastAPI(title="Candidate Recommendation API")
+    settings = get_settings()  # from app.config.settings
 
-    @app.on_event("startup")
-    async def startup_event():
-        # Ensure MongoDB connection is established
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # Ensure MongoDB connection is established and the pool is warm before serving
         await connect_to_mongo(settings)
-        # we have to validate indexes here
-
-    @app.on_event("shutdown")
-    async def shutdown_event():
-        # Close MongoDB connection
+        collections = init_collections()
+        await warm_up_pool()
+        # One instance of each service is shared by every request (and the JD embedding cache with it)
+        embedding_service = EmbeddingService(settings=settings)
+        job_service = JobListingService(
+            collection=collections.jobs,
+            embedding_service=embedding_service,
+            settings=settings,
+        )
+        await job_service.ensure_indexes()
+        job_service.start_background_refresh()
+        app.state.embedding_service = embedding_service
+        app.state.job_service = job_service
+        app.state.search_service = SearchService(
+            settings=settings,
+            job_collection=collections.jobs,
+            userprofiles_collection=collections.user_profiles,
+            application_collection=collections.applications,
+            embedding_service=embedding_service,
+            job_service=job_service,
+        )
+        yield
+        # Stop background work, then close the embedding HTTP pool and the MongoDB connection
+        await job_service.stop_background_refresh()
+        await close_azure_client()
         await close_mongo_connection()
 
-    @app.get("/health", response_class=JSONResponse)
-    async def health_check():
+    app = FastAPI(title="Candidate Recommendation API", lifespan=lifespan)
+
+    # Leave response_class at its default: with a return type set, FastAPI serializes
+    # straight to JSON bytes through pydantic-core instead of json.dumps
+    @app.get("/health")
+    async def health_check() -> dict:
         return {"status": "ok"}
     # include candidate/search/feedback routes 
 
@@ -39,3 +65,10 @@ def create_app() -> FastAPI:
     return app
 
 app = create_app()
+
+
+if __name__ == "__main__":
+    # Imported only for direct runs; workers started by the uvicorn CLI never pay for it here
+    import uvicorn
+
+    uvicorn.run("app.main:app", host="0.0.0.0", port=8000)
@@ -11,16 +11,18 @@ class PyObjectId(ObjectId):
         cls, source_type, handler: GetCoreSchemaHandler
     ):
         def validate(value):
-            if isinstance(value, ObjectId):
+            # Values read from MongoDB are already ObjectIds; check that first
+            if type(value) is ObjectId or isinstance(value, ObjectId):
                 return value
-            if ObjectId.is_valid(value):
+            if isinstance(value, str) and ObjectId.is_valid(value):
                 return ObjectId(value)
             raise ValueError("Invalid ObjectId")
 
-        return core_schema.no_info_after_validator_function(
+        # Serialize to str in JSON mode here, so models need no json_encoders
+        return core_schema.no_info_plain_validator_function(
             validate,
-            core_schema.union_schema(
-                [core_schema.is_instance_schema(ObjectId), core_schema.str_schema()]
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                str, return_schema=core_schema.str_schema(), when_used="json"
             ),
         )
 
@@ -28,8 +30,6 @@ class PyObjectId(ObjectId):
     def __get_pydantic_json_schema__(
         cls, core_schema_obj, handler: GetJsonSchemaHandler
     ):
-        json_schema = handler(core_schema_obj)
-        json_schema.update(type="string")
-        return json_schema
+        return {"type": "string"}
 
 
@@ -4,10 +4,10 @@ from typing import Dict, List, Optional, Any
 from pydantic import BaseModel, Field
 
 from app.models.base import PyObjectId
+from app.utils.dates import utcnow
 
 
 class JobEmbeddingMetadata(BaseModel):
-    vector: Optional[List[float]] = Field(default=None, alias="job_embedding_vector")
     vector_size: Optional[int] = Field(default=None, alias="job_embedding_vector_size")
     model: Optional[str] = Field(default=None, alias="job_embedding_model")
     generated_at: Optional[datetime] = Field(default=None, alias="job_embedding_updated_at")
@@ -40,10 +40,9 @@ class JobListingBase(BaseModel):
 
 class JobListingInDB(JobListingBase):
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
-    created_at: datetime = Field(default_factory=datetime.utcnow, alias="createdAt")
-    updated_at: datetime = Field(default_factory=datetime.utcnow, alias="updatedAt")
+    created_at: datetime = Field(default_factory=utcnow, alias="createdAt")
+    updated_at: datetime = Field(default_factory=utcnow, alias="updatedAt")
     embedding: JobEmbeddingMetadata = Field(default_factory=JobEmbeddingMetadata)
 
     class Config:
         allow_population_by_field_name = True
-        json_encoders = {PyObjectId: str}
@@ -1,13 +1,14 @@
 """Pydantic DTOs for search routes and related filters."""
 
 from datetime import datetime
-from typing import List, Literal, Optional
+from typing import Any, Dict, List, Literal, Optional, Tuple
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, model_validator
 
 from app.models.base import PyObjectId
 
-MODEL_CONFIG = ConfigDict(populate_by_name=True, json_encoders={PyObjectId: str})
+# Search DTOs are built once per response and never mutated afterwards
+MODEL_CONFIG = ConfigDict(populate_by_name=True, frozen=True)
 
 
 class SkillFilter(BaseModel):
@@ -36,12 +37,16 @@ class PaginationParams(BaseModel):
     page_size: int = 20
 
 
+# Frozen, so one shared instance can stand in for "no pagination supplied" on every request
+_DEFAULT_PAGINATION = PaginationParams.model_construct(page=1, page_size=20)
+
+
 class BasicSearchRequest(BaseModel):
     model_config = MODEL_CONFIG
 
     keyword: Optional[str] = None
     filters: Optional[CandidateFilter] = None
-    pagination: PaginationParams = PaginationParams()
+    pagination: PaginationParams = Field(default_factory=lambda: _DEFAULT_PAGINATION)
 
 
 class SemanticSearchRequest(BaseModel):
@@ -85,6 +90,39 @@ class SkillDetail(BaseModel):
     skill_name: str
     proficiency_level: Optional[str] = None  # Expert, Intermediate, Beginner
 
+    @model_validator(mode="before")
+    @classmethod
+    def _coalesce_keys(cls, data: Any) -> Any:
+        # Profiles may store a skill as just its name, or spell its keys several ways. The first
+        # non-empty variant wins, so a null skill_proficiency does not hide a populated level;
+        # a skill without any name fails validation and is dropped by the caller
+        if isinstance(data, str):
+            return {"skill_name": data}
+        if not isinstance(data, dict):
+            return data
+        return {
+            "skill_name": data.get("skill_name") or data.get("name") or None,
+            "proficiency_level": (
+                data.get("skill_proficiency")
+                or data.get("proficiency_level")
+                or data.get("proficiency")
+                or data.get("level")
+            ),
+        }
+
+
+# (year, month) -> "Jun 2022"; bounded by the distinct months seen, so it never needs eviction
+_MONTH_LABELS: Dict[Tuple[int, int], str] = {}
+
+
+def _format_month(value: datetime) -> str:
+    # strftime goes through locale lookups; each month is formatted once per process
+    key = (value.year, value.month)
+    label = _MONTH_LABELS.get(key)
+    if label is None:
+        label = _MONTH_LABELS[key] = value.strftime("%b %Y")
+    return label
+
 
 class ExperienceDetail(BaseModel):
     """Work experience entry."""
@@ -98,6 +136,39 @@ class ExperienceDetail(BaseModel):
     description: Optional[str] = None
     is_current: Optional[bool] = False
 
+    @model_validator(mode="before")
+    @classmethod
+    def _derive_dates(cls, data: Any) -> Any:
+        # Raw profile entries spell company/title several ways (first non-empty variant wins) and
+        # hold datetimes (or strings) under snake or camel case; format those as "Jun 2022", treat
+        # a missing end date as "Present", and derive duration/is_current
+        if not isinstance(data, dict):
+            return data
+        start_raw = data.get("start_date") or data.get("startDate")
+        end_raw = data.get("end_date") or data.get("endDate")
+        
+        if isinstance(start_raw, datetime):
+            start_date = _format_month(start_raw)
+        else:
+            start_date = str(start_raw) if start_raw else ""
+        
+        if isinstance(end_raw, datetime):
+            end_date = _format_month(end_raw)
+        elif not end_raw:
+            end_date = "Present"
+        else:
+            end_date = str(end_raw)
+        
+        return {
+            **data,
+            "company_name": data.get("company") or data.get("company_name"),
+            "job_title": data.get("position") or data.get("role") or data.get("title") or data.get("job_title"),
+            "start_date": start_date,
+            "end_date": end_date,
+            "duration": f"{start_date} - {end_date}" if start_date else None,
+            "is_current": not end_raw or (isinstance(end_raw, str) and end_raw.lower() == "present"),
+        }
+
 
 class ContactInfo(BaseModel):
     """Contact information."""
@@ -143,6 +214,33 @@ class SearchCandidateHit(BaseModel):
     embedding_generated_at: Optional[datetime] = None
 
 
+# Compiled once at import; pydantic-core walks raw userprofile skills/experience lists in one call
+SKILL_LIST_ADAPTER = TypeAdapter(List[SkillDetail])
+EXPERIENCE_LIST_ADAPTER = TypeAdapter(List[ExperienceDetail])
+
+
+# Mongo projection covering exactly the userprofile fields read to build a SearchCandidateHit.
+# Keep in sync with the model above; never add embedding_vector here.
+SEARCH_HIT_PROJECTION = {
+    "_id": 1,
+    "user": 1,
+    "personal_information.full_name": 1,
+    "personal_information.first_name": 1,
+    "personal_information.last_name": 1,
+    "personal_information.email": 1,
+    "personal_information.phone": 1,
+    "personal_information.phone_number": 1,
+    "personal_information.location": 1,
+    "socials.github": 1,
+    "socials.linkedin": 1,
+    "skills": 1,
+    "experience": 1,
+    "location": 1,
+    "embedding_model": 1,
+    "embedding_last_generated_at": 1,
+}
+
+
 class PaginationMeta(BaseModel):
     model_config = MODEL_CONFIG
 
@@ -171,7 +269,7 @@ class InitialQuestionAnswer(BaseModel):
     """Question and answer pair from application."""
     model_config = MODEL_CONFIG
     
-    question: str
+    question: str = ""
     candidate_answer: Optional[bool] = Field(None, alias="candidateAnswer")
     expected_answer: Optional[bool] = Field(None, alias="expectedAnswer")
     _id: Optional[PyObjectId] = None
@@ -190,8 +288,8 @@ class RuthiSideStage(BaseModel):
     """Ruthi-side screening stage information."""
     model_config = MODEL_CONFIG
     
-    name: str
-    order: int
+    name: str = ""
+    order: int = 0
     is_completed: bool = Field(False, alias="isCompleted")
     timestamps: Optional[StageTimestamp] = None
     _id: Optional[PyObjectId] = None
@@ -227,6 +325,11 @@ class AppliedCandidateHit(BaseModel):
     similarity_score: Optional[float] = None
 
 
+# Raw application sub-documents already use the model aliases; validated per page in one call each
+QUESTION_LIST_ADAPTER = TypeAdapter(List[InitialQuestionAnswer])
+STAGE_LIST_ADAPTER = TypeAdapter(List[RuthiSideStage])
+
+
 class NewAppliedSearchResponse(BaseModel):
     """Response model for applied candidate search with application details."""
     model_config = MODEL_CONFIG
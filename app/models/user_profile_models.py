@@ -1,7 +1,6 @@
 from datetime import datetime
 from typing import List, Optional ,Dict, Any, Literal
 from pydantic import BaseModel, EmailStr, Field
-from bson import ObjectId
 from app.models.base import PyObjectId
 
 class EducationEntry(BaseModel):
@@ -16,7 +15,6 @@ class EducationEntry(BaseModel):
     class Config:
         allow_population_by_field_name = True
         arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
 
 # repeat for ExperienceEntry, SkillEntry (With proficiency enum), ProjectEntry, plus placeholders for other arrays even if empty
 
@@ -31,7 +29,6 @@ class ExperienceEntry(BaseModel):
     class Config:
         allow_population_by_field_name = True
         arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
 
 class SkillEntry(BaseModel):
     id:PyObjectId = Field(default_factory=PyObjectId, alias="_id")
@@ -41,7 +38,6 @@ class SkillEntry(BaseModel):
     class Config:
         allow_population_by_field_name = True
         arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
 
 class ProjectEntry(BaseModel):
     id:PyObjectId = Field(default_factory=PyObjectId, alias="_id")
@@ -52,7 +48,6 @@ class ProjectEntry(BaseModel):
     class Config:
         allow_population_by_field_name = True
         arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
 
 class PersonalInformation(BaseModel):
     first_name: str
@@ -62,12 +57,11 @@ class PersonalInformation(BaseModel):
     expected_salary: Optional[int] = None
 
 class EmbeddingMetadata(BaseModel):
-    vector: Optional[List[float]] = Field(None, alias = "embedding_vector")
     model: Optional[str] = Field(None, alias = "embedding_model")
     dimensions: Optional[int] = Field(None, alias = "embedding_dimensions")
     version: Optional[str] = Field(None, alias = "embedding_version")
     last_generated_at: Optional[datetime] = Field(None, alias = "embedding_last_generated_at")
-    status : Literal["queued", "processing", "ready", "error"] = Field("queued", alias="embedding_status")
+    status : Literal["queued", "pending", "processing", "ready", "stale", "error", "missing"] = Field("queued", alias="embedding_status")
     error: Optional[str] = Field(None, alias="embedding_error")
 
 class CandidateBase(BaseModel):
@@ -112,6 +106,5 @@ class CandidateInDB(CandidateBase):
 
 class CandidateResponse(CandidateInDB):
         class Config:
-            json_encoders = {PyObjectId: str}
             allow_population_by_field_name = True
             arbitrary_types_allowed = True
\ No newline at end of file
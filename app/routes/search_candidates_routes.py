@@ -1,12 +1,9 @@
 """Search endpoints for applied and global candidate matches."""
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
-from app.config.settings import Settings
-from app.db.client import get_database
 from app.models.search_models import GlobalSearchResponse, NewAppliedSearchResponse
 from app.services.base import NotFoundError
-from app.services.embedding_service import EmbeddingService
 from app.services.search_service import SearchService
 from app.utils.logger import get_logger
 
@@ -15,23 +12,9 @@ logger = get_logger(__name__)
 router = APIRouter(prefix="/search", tags=["search"])
 
 
-async def get_search_service() -> SearchService:
-    """Provide a fully wired SearchService instance per request."""
-    settings = Settings()
-    db = get_database(settings)
-
-    jobs = db[settings.JOB_COLLECTION]
-    userprofiles = db[settings.USER_PROFILES_COLLECTION]
-    applications = db[settings.APPLICATION_COLLECTION]
-    embedding_service = EmbeddingService(settings=settings)
-
-    return SearchService(
-        settings=settings,
-        job_collection=jobs,
-        userprofiles_collection=userprofiles,
-        application_collection=applications,
-        embedding_service=embedding_service,
-    )
+async def get_search_service(request: Request) -> SearchService:
+    """Provide the SearchService built once in the app lifespan."""
+    return request.app.state.search_service
 
 
 @router.get("/applied", response_model=NewAppliedSearchResponse)
@@ -59,17 +42,17 @@ async def search_applied_candidates(
     Raises:
         HTTPException: 404 if job not found, 500 for other errors
     """
-    logger.info(f"Applied search request: job_id={job_id}, page={page}, count={count}")
+    logger.info("Applied search request: job_id=%s, page=%s, count=%s", job_id, page, count)
     
     try:
         response = await service.search_applied(job_id=job_id, page=page, count=count)
-        logger.info(f"Applied search completed: {len(response.results)} results")
+        logger.info("Applied search completed: %s results", len(response.results))
         return response
     except NotFoundError as exc:
-        logger.warning(f"Job not found: {job_id}")
+        logger.warning("Job not found: %s", job_id)
         raise HTTPException(status_code=404, detail=str(exc)) from exc
     except Exception as exc:
-        logger.error(f"Applied search error for job {job_id}: {exc}", exc_info=True)
+        logger.error("Applied search error for job %s: %s", job_id, exc, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(exc)}") from exc
 
 
@@ -96,15 +79,15 @@ async def search_global_candidates(
     Raises:
         HTTPException: 404 if job not found, 500 for other errors
     """
-    logger.info(f"Global search request: job_id={job_id}, count={count}")
+    logger.info("Global search request: job_id=%s, count=%s", job_id, count)
     
     try:
         response = await service.search_global(job_id=job_id, count=count)
-        logger.info(f"Global search completed: {len(response.results)} results")
+        logger.info("Global search completed: %s results", len(response.results))
         return response
     except NotFoundError as exc:
-        logger.warning(f"Job not found: {job_id}")
+        logger.warning("Job not found: %s", job_id)
         raise HTTPException(status_code=404, detail=str(exc)) from exc
     except Exception as exc:
-        logger.error(f"Global search error for job {job_id}: {exc}", exc_info=True)
+        logger.error("Global search error for job %s: %s", job_id, exc, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(exc)}") from exc
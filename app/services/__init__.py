@@ -1,5 +1,24 @@
 """Service layer exports for embedding, search, and user profile helpers."""
 
-from .embedding_service import EmbeddingService
-from .search_service import SearchService
-from .user_profile_service import UserProfileService
\ No newline at end of file
+import importlib
+
+# Exported name -> submodule; resolved on first attribute access (PEP 562) so importing
+# one service module does not drag in openai/numpy through its siblings
+_submods = {
+    "EmbeddingService": "embedding_service",
+    "SearchService": "search_service",
+    "UserProfileService": "user_profile_service",
+}
+
+__all__ = list(_submods)
+
+
+def __getattr__(name):
+    if name in _submods:
+        module = importlib.import_module(f".{_submods[name]}", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
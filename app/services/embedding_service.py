@@ -1,15 +1,22 @@
 from __future__ import annotations
 
 import asyncio
-import time
+import base64
+import html
+import re
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Sequence
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
 
-from openai import AzureOpenAI
+import httpx
+import numpy as np
+from openai import AsyncAzureOpenAI
 from openai._exceptions import OpenAIError
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_random_exponential
 
 from app.config.settings import Settings
+from app.utils.dates import as_utc, utcnow
+from app.utils.vectors import l2_normalize
 
 
 class EmbeddingServiceError(RuntimeError):
@@ -18,7 +25,8 @@ class EmbeddingServiceError(RuntimeError):
 
 @dataclass(frozen=True)
 class EmbeddingResult:
-    vector: List[float]
+    # Unit-length float32 array; callers pack it to bytes or call tolist() depending on the target field
+    vector: np.ndarray
     model: str
     generated_at: datetime
 
@@ -29,139 +37,253 @@ class EmbeddingService:
         settings: Settings,
         *,
         max_retries: int = 3,
-        retry_delay_seconds: float = 2.0,
+        retry_delay_seconds: float = 0.5,
+        max_retry_delay_seconds: float = 30.0,
+        max_batch_size: int = 64,
     ) -> None:
         self.settings = settings
         self._max_retries = max_retries
         self._retry_delay_seconds = retry_delay_seconds
+        self._max_retry_delay_seconds = max_retry_delay_seconds
+        # Inputs per embeddings.create call; profile/JD texts are short, so count bounds the payload
+        self._max_batch_size = max_batch_size
 
     async def generate_candidate_embedding(self, candidate_doc: Dict[str, Any]) -> EmbeddingResult:
         text = self._build_candidate_text(candidate_doc)
         vector = await self._generate_embedding(text)
-        self._validate_vector(vector)
         return EmbeddingResult(
-            vector=vector,
+            vector=self._validate_vector(vector),
             model=self.settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
-            generated_at=datetime.utcnow(),
+            generated_at=utcnow(),
         )
 
     async def generate_job_embedding(self, job_doc: Dict[str, Any]) -> EmbeddingResult:
         text = self._build_job_text(job_doc)
         vector = await self._generate_embedding(text)
-        self._validate_vector(vector)
         return EmbeddingResult(
-            vector=vector,
+            vector=self._validate_vector(vector),
             model=self.settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
-            generated_at=datetime.utcnow(),
+            generated_at=utcnow(),
         )
 
-    async def _generate_embedding(self, text: str) -> List[float]:
-        return await asyncio.to_thread(self._sync_generate_embedding, text)
+    async def generate_candidate_embeddings(self, candidate_docs: Sequence[Dict[str, Any]]) -> List[Union[EmbeddingResult, BaseException]]:
+        return await self._generate_outcomes(candidate_docs, self._build_candidate_text)
 
-    def _sync_generate_embedding(self, text: str) -> List[float]:
-        client = _get_azure_client(self.settings)
-        attempt = 0
-        while True:
+    async def generate_job_embeddings(self, job_docs: Sequence[Dict[str, Any]]) -> List[Union[EmbeddingResult, BaseException]]:
+        return await self._generate_outcomes(job_docs, self._build_job_text)
+
+    async def _generate_outcomes(
+        self, docs: Sequence[Dict[str, Any]], build_text: Callable[[Dict[str, Any]], str]
+    ) -> List[Union[EmbeddingResult, BaseException]]:
+        # One round-trip per batch instead of one per document. Outcomes keep input order and
+        # hold either the result or the exception for that document, so a document whose text
+        # cannot be built, or an input the API rejects, fails only itself.
+        outcomes: List[Union[EmbeddingResult, BaseException, None]] = [None] * len(docs)
+        positions: List[int] = []
+        texts: List[str] = []
+        for position, doc in enumerate(docs):
             try:
-                response = client.embeddings.create(
-                    model=self.settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
-                    input=text,
-                )
-                vector = response.data[0].embedding
-                if not isinstance(vector, list):
-                    raise EmbeddingServiceError("Embedding vector missing or invalid.")
-                return vector
-            except OpenAIError as exc:
-                attempt += 1
-                if attempt >= self._max_retries:
-                    raise EmbeddingServiceError("Azure OpenAI embedding request failed") from exc
-                time.sleep(self._retry_delay_seconds * attempt)
-
-    def _validate_vector(self, vector: Sequence[float]) -> None:
-        if len(vector) != self.settings.EMBEDDING_VECTOR_SIZE:
+                texts.append(build_text(doc))
+            except Exception as exc:
+                outcomes[position] = exc
+            else:
+                positions.append(position)
+
+        for start in range(0, len(texts), self._max_batch_size):
+            chunk = texts[start:start + self._max_batch_size]
+            try:
+                vectors: List[Union[np.ndarray, BaseException]] = list(await self._generate_embeddings_batch(chunk))
+            except EmbeddingServiceError as exc:
+                if len(chunk) == 1:
+                    vectors = [exc]
+                else:
+                    # The whole request was refused; retry each input alone to find the bad one
+                    vectors = await asyncio.gather(
+                        *(self._generate_embedding(text) for text in chunk), return_exceptions=True
+                    )
+            generated_at = utcnow()
+            for position, vector in zip(positions[start:start + self._max_batch_size], vectors):
+                outcomes[position] = self._to_result(vector, generated_at)
+        return outcomes
+
+    def _to_result(self, vector: Union[np.ndarray, BaseException], generated_at: datetime) -> Union[EmbeddingResult, BaseException]:
+        if isinstance(vector, BaseException):
+            return vector
+        try:
+            return EmbeddingResult(
+                vector=self._validate_vector(vector),
+                model=self.settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+                generated_at=generated_at,
+            )
+        except ValueError as exc:
+            return exc
+
+    async def _generate_embedding(self, text: str) -> np.ndarray:
+        vectors = await self._generate_embeddings_batch([text])
+        return vectors[0]
+
+    async def _generate_embeddings_batch(self, texts: List[str]) -> List[np.ndarray]:
+        client = _get_azure_client(self.settings)
+        # Jittered exponential backoff keeps concurrent callers from retrying in lockstep on 429s
+        retrying = AsyncRetrying(
+            wait=wait_random_exponential(
+                multiplier=self._retry_delay_seconds, max=self._max_retry_delay_seconds
+            ),
+            stop=stop_after_attempt(self._max_retries),
+            retry=retry_if_exception_type(OpenAIError),
+            reraise=True,
+        )
+        try:
+            async for attempt in retrying:
+                with attempt:
+                    # base64 payloads decode straight into float32 arrays, never a list of boxed floats
+                    response = await client.embeddings.create(
+                        model=self.settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+                        input=texts,
+                        encoding_format="base64",
+                    )
+        except OpenAIError as exc:
+            raise EmbeddingServiceError("Azure OpenAI embedding request failed") from exc
+
+        data = sorted(response.data, key=lambda item: item.index)
+        if len(data) != len(texts) or not all(isinstance(item.embedding, str) for item in data):
+            raise EmbeddingServiceError("Embedding vector missing or invalid.")
+        return [np.frombuffer(base64.b64decode(item.embedding), dtype="<f4") for item in data]
+
+    def _validate_vector(self, vector: np.ndarray) -> np.ndarray:
+        # Every stored embedding is unit length: search scores with a plain dot product, don't re-normalize
+        if vector.shape[0] != self.settings.EMBEDDING_VECTOR_SIZE:
             raise ValueError(
-                f"Expected embedding length {self.settings.EMBEDDING_VECTOR_SIZE}, got {len(vector)}."
+                f"Expected embedding length {self.settings.EMBEDDING_VECTOR_SIZE}, got {vector.shape[0]}."
             )
+        return l2_normalize(vector)
 
     def _build_candidate_text(self, doc: Dict[str, Any]) -> str:
-        personal = doc.get("personal_information", {})
+        personal = doc.get("personal_information") or {}
         first = (personal.get("first_name") or "").strip()
         last = (personal.get("last_name") or "").strip()
-        full_name = " ".join(part for part in [first, last] if part) or "Unnamed candidate"
-
-        skills = doc.get("skills") or []
-        skills_str = ", ".join(skills) if skills else "Skills not provided"
 
-        experiences = doc.get("experience") or []
-        exp_segments: List[str] = []
-        for exp in experiences:
-            role = exp.get("role") or exp.get("title") or "Role n/a"
-            company = exp.get("company") or exp.get("organization") or "Org n/a"
-            years = exp.get("duration") or exp.get("years") or ""
-            exp_segments.append(f"{role} at {company} ({years})".strip())
-        experience_str = "; ".join(exp_segments) if exp_segments else "Experience not provided"
-
-        summary = doc.get("summary") or doc.get("about") or "No summary provided"
+        exp_segments = [
+            f"{exp.get('role') or exp.get('title') or 'Role n/a'} at "
+            f"{exp.get('company') or exp.get('organization') or 'Org n/a'} "
+            f"({exp.get('duration') or exp.get('years') or ''})"
+            for exp in doc.get("experience") or []
+        ]
 
-        return (
-            f"{full_name} | Skills: {skills_str} | Experience: {experience_str} | Summary: {summary}"
+        return _format_doc(
+            _CANDIDATE_TEMPLATE,
+            _CANDIDATE_DEFAULTS,
+            {
+                "full_name": f"{first} {last}".strip(),
+                "skills": ", ".join(doc.get("skills") or []),
+                "experience": "; ".join(exp_segments),
+                "summary": doc.get("summary") or doc.get("about"),
+            },
         )
 
     def _build_job_text(self, doc: Dict[str, Any]) -> str:
-        title = doc.get("title") or "Untitled role"
-        employment_type = doc.get("employmentType") or doc.get("employment_type") or "Type n/a"
-        work_model = doc.get("workModel") or doc.get("work_model") or "Work model n/a"
-        experience_range = (doc.get("experienceRange") or {}).get("summary") or "Experience range n/a"
-
-        skills = doc.get("skillsRequired") or doc.get("skills") or []
-        skills_str = ", ".join(skills) if skills else "Skills not provided"
-
         industry = doc.get("industry") or doc.get("industries") or []
-        industry_str = ", ".join(industry) if isinstance(industry, list) else str(industry or "Industry n/a")
-
         locations = doc.get("locations") or doc.get("location") or []
         if isinstance(locations, list):
             loc_strs = []
             for loc in locations:
                 if isinstance(loc, dict):
                     # Extract city, state, country if available
-                    parts = [loc.get(k) for k in ["city", "state", "country"] if loc.get(k)]
+                    parts = [loc[k] for k in ("city", "state", "country") if loc.get(k)]
                     if parts:
                         loc_strs.append(", ".join(parts))
                 elif isinstance(loc, str):
                     loc_strs.append(loc)
-            locations_str = ", ".join(loc_strs) if loc_strs else "Locations not provided"
-        else:
-            locations_str = locations or "Locations not provided"
-
-        description = doc.get("description") or "Description not provided"
-
-        parts = [
-            title,
-            employment_type,
-            work_model,
-            experience_range,
-            f"Skills: {skills_str}",
-            f"Industry: {industry_str}",
-            f"Locations: {locations_str}",
-            f"Description: {description}",
-        ]
-        return " | ".join(part.strip() for part in parts)
+            locations = ", ".join(loc_strs)
+
+        return _format_doc(
+            _JOB_TEMPLATE,
+            _JOB_DEFAULTS,
+            {
+                "title": doc.get("title"),
+                "employment_type": doc.get("employmentType") or doc.get("employment_type"),
+                "work_model": doc.get("workModel") or doc.get("work_model"),
+                "experience_range": (doc.get("experienceRange") or {}).get("summary"),
+                "skills": ", ".join(doc.get("skillsRequired") or doc.get("skills") or []),
+                "industry": ", ".join(industry) if isinstance(industry, list) else str(industry),
+                "locations": locations,
+                "description": doc.get("description"),
+            },
+        )
 
     @staticmethod
-    def jd_cache_key(job_id: str, updated_at: datetime) -> str:
-        return f"{job_id}:{updated_at.isoformat()}"
+    def jd_cache_key(job_id: str, updated_at: Optional[datetime]) -> str:
+        # Jobs without updatedAt never go stale, so the id alone identifies the embedding.
+        # Normalized so naive and tz-aware reads of the same instant share a key.
+        return f"{job_id}:{as_utc(updated_at).isoformat() if updated_at else ''}"
+
+
+_CANDIDATE_TEMPLATE = "{full_name} | Skills: {skills} | Experience: {experience} | Summary: {summary}"
+_CANDIDATE_DEFAULTS = {
+    "full_name": "Unnamed candidate",
+    "skills": "Skills not provided",
+    "experience": "Experience not provided",
+    "summary": "No summary provided",
+}
+
+_JOB_TEMPLATE = (
+    "{title} | {employment_type} | {work_model} | {experience_range} | Skills: {skills} | "
+    "Industry: {industry} | Locations: {locations} | Description: {description}"
+)
+_JOB_DEFAULTS = {
+    "title": "Untitled role",
+    "employment_type": "Type n/a",
+    "work_model": "Work model n/a",
+    "experience_range": "Experience range n/a",
+    "skills": "Skills not provided",
+    "industry": "Industry n/a",
+    "locations": "Locations not provided",
+    "description": "Description not provided",
+}
+
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"\s+")
+# ~4 characters per token for English text; keeps inputs near 2048 tokens, well under the
+# model's 8192-token limit, without pulling a tokenizer into the request path
+_MAX_TEXT_CHARS = 2048 * 4
 
 
-_azure_client: Optional[AzureOpenAI] = None
+def _normalize_text(text: str) -> str:
+    # Drop HTML markup from rich-text fields, collapse whitespace runs and cap the length
+    if "<" in text:
+        text = html.unescape(_TAG_RE.sub(" ", text))
+    return _WS_RE.sub(" ", text).strip()[:_MAX_TEXT_CHARS]
 
 
-def _get_azure_client(settings: Settings) -> AzureOpenAI:
+def _format_doc(template: str, defaults: Dict[str, str], values: Dict[str, Any]) -> str:
+    # Empty or missing values fall back to the per-field default in a single format pass
+    text = template.format_map({key: values.get(key) or default for key, default in defaults.items()})
+    return _normalize_text(text)
+
+
+_azure_client: Optional[AsyncAzureOpenAI] = None
+
+# One pooled HTTP/2 connection set for all embedding calls in the process
+_HTTP_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=100)
+_HTTP_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+
+
+def _get_azure_client(settings: Settings) -> AsyncAzureOpenAI:
     global _azure_client
     if _azure_client is None:
-        _azure_client = AzureOpenAI(
+        _azure_client = AsyncAzureOpenAI(
             azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
             api_key=settings.AZURE_OPENAI_API_KEY,
             api_version=settings.AZURE_OPENAI_API_VERSION,
+            http_client=httpx.AsyncClient(http2=True, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT),
         )
-    return _azure_client
\ No newline at end of file
+    return _azure_client
+
+
+async def close_azure_client() -> None:
+    """Close the shared Azure OpenAI client and its connection pool."""
+    global _azure_client
+    if _azure_client is not None:
+        await _azure_client.close()
+        _azure_client = None
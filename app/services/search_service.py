@@ -2,14 +2,22 @@
 Search service coordinating semantic candidate search.
 Handles both applied-only and global candidate searches using vector similarity.
 """
-from datetime import datetime as dt
-from typing import Any, Dict, List, Optional
+import asyncio
+import heapq
+from typing import Any, Dict, List, Optional, Type
 
+import numpy as np
 from bson import ObjectId
 from bson.errors import InvalidId
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
 from app.config.settings import Settings
 from app.models.search_models import (
+    EXPERIENCE_LIST_ADAPTER,
+    QUESTION_LIST_ADAPTER,
+    SEARCH_HIT_PROJECTION,
+    SKILL_LIST_ADAPTER,
+    STAGE_LIST_ADAPTER,
     AppliedCandidateHit,
     ContactInfo,
     ExperienceDetail,
@@ -20,15 +28,81 @@ from app.models.search_models import (
     RuthiSideStage,
     SearchCandidateHit,
     SkillDetail,
-    StageTimestamp,
 )
 from app.services.base import NotFoundError
 from app.services.embedding_service import EmbeddingService
-from app.services.job_listing_service import JobListingService
+from app.services.job_listing_service import JOB_EMBEDDING_PROJECTION, JobListingService
+from app.utils.cache import TTLCache
+from app.utils.dates import as_utc
 from app.utils.logger import get_logger
+from app.utils.vectors import as_float32
 
 logger = get_logger(__name__)
 
+# Join-side projection for manual scoring: the packed int8 embedding when present, and the
+# float vector (a BSON float32 vector, or a legacy array of doubles) only for profiles without it
+_SCORING_PROJECTION = {
+    "_id": 0,
+    "user": 1,
+    "embedding_int8": 1,
+    "embedding_scale": 1,
+    "embedding_vector": {
+        "$cond": [{"$ifNull": ["$embedding_int8", False]}, "$$REMOVE", "$embedding_vector"]
+    },
+}
+
+# Application fields copied into AppliedCandidateHit; anything else stored on the document
+# (embeddings, audit trails, ...) stays on the server
+_APPLICATION_PAGE_PROJECTION = {
+    "_id": 1,
+    "candidateId": 1,
+    "jobId": 1,
+    "initialQuestionsAnswers": 1,
+    "currentStatus": 1,
+    "ruthiSideStages": 1,
+    "movedToRecruiter": 1,
+    "notes": 1,
+    "appliedAt": 1,
+    "recruiterSideStages": 1,
+    "documents": 1,
+    "createdAt": 1,
+    "updatedAt": 1,
+}
+
+# Vector search hits are streamed in batches of this size so hit building overlaps the network
+_VECTOR_SEARCH_BATCH_SIZE = 50
+
+# Distinct (JD embedding, limit) rankings kept when the search result cache is enabled
+_SEARCH_RESULT_CACHE_SIZE = 1024
+
+
+def _to_object_id(value: str) -> Optional[ObjectId]:
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        return None
+
+
+def _validate_items(adapter: TypeAdapter, model: Type[BaseModel], raw: Any) -> list:
+    """
+    Validate a raw Mongo sub-document list in one pydantic-core call.
+    
+    Falls back to per-item validation only when the list is dirty; entries that still fail
+    are dropped and logged.
+    """
+    if not isinstance(raw, list):
+        return []
+    try:
+        return adapter.validate_python(raw)
+    except ValidationError:
+        items = []
+        for item in raw:
+            try:
+                items.append(model.model_validate(item))
+            except ValidationError as exc:
+                logger.warning("Dropping malformed %s entry: %s", model.__name__, exc)
+        return items
+
 
 class SearchService:
     """Coordinates applied/global semantic searches with JD embedding caching."""
@@ -41,15 +115,26 @@ class SearchService:
         userprofiles_collection=None,
         application_collection=None,
         embedding_service=None,
+        job_service: Optional[JobListingService] = None,
     ) -> None:
         self._settings = settings
+        # Settings never change at runtime; hoist the values read on every search
+        self._vector_index = settings.USERPROFILE_VECTOR_INDEX
+        self._default_global_limit = settings.DEFAULT_GLOBAL_LIMIT
+        self._max_global_limit = settings.MAX_GLOBAL_LIMIT
         self._jobs = job_collection
         self._userprofiles = userprofiles_collection
         self._applications = application_collection
         self._embedding_service = embedding_service
+
+        # Opt-in reuse of global rankings for repeated JD embeddings; staleness is bounded by the TTL
+        ttl = settings.SEARCH_RESULT_CACHE_TTL_SECONDS
+        self._global_results: Optional[TTLCache] = (
+            TTLCache(maxsize=_SEARCH_RESULT_CACHE_SIZE, ttl=ttl) if ttl > 0 else None
+        )
         
-        # Initialize job listing service for embedding management
-        self._job_service = JobListingService(
+        # Job listing service for embedding management; share one when the caller already has it
+        self._job_service = job_service or JobListingService(
             collection=job_collection,
             embedding_service=embedding_service,
             settings=settings,
@@ -72,20 +157,19 @@ class SearchService:
         Raises:
             NotFoundError: If job doesn't exist
         """
-        logger.info(f"Starting applied search for job {job_id}, page={page}, count={count}")
+        logger.info("Starting applied search for job %s, page=%s, count=%s", job_id, page, count)
         
-        # Get job and ensure it has an embedding
-        job = await self._get_job_or_404(job_id)
-        jd_embedding, meta = await self._ensure_job_embedding(job)
-        
-        # Fetch ALL applications for the job to ensure we rank everyone
+        # Get job and ensure it has an embedding, while concurrently fetching ALL applications for
+        # the job with applicant vectors joined in (they depend only on job_id) so we rank everyone.
         # We'll handle pagination after ranking
-        applications, total = await self._fetch_applications(
-            job_id, page=1, page_size=0  # 0 means fetch all
+        (jd_embedding, meta), applications = await asyncio.gather(
+            self._load_job_embedding(job_id),
+            self._fetch_applications_with_vectors(job_id),
         )
+        total = len(applications)
         
         if not applications:
-            logger.info(f"No applied candidates found for job {job_id}")
+            logger.info("No applied candidates found for job %s", job_id)
             pagination = PaginationMeta(page=page, page_size=count, total_matches=0)
             return NewAppliedSearchResponse(
                 job_id=job_id,
@@ -95,81 +179,71 @@ class SearchService:
                 embedding_model=meta["model"],
             )
         
-        # Extract candidate IDs to fetch profiles
-        candidate_ids = [str(app["candidateId"]) for app in applications if app.get("candidateId")]
-        logger.debug(f"Found {len(candidate_ids)} applied candidates for job {job_id}")
+        logger.debug("Found %s applied candidates for job %s", total, job_id)
         
         # Rank candidates manually since we have a specific list of IDs
         # This avoids the issue where $vectorSearch limits might filter out our candidates
         # before the $match stage can select them.
-        ranked_hits = await self._fetch_and_rank_profiles_manually(
+        scores = self._score_profiles_manually(
             jd_embedding=jd_embedding,
-            candidate_ids=candidate_ids,
+            profiles=[profile for app in applications for profile in app.get("profiles", [])],
         )
         
-        # Create a map of user_id -> SearchCandidateHit for easy lookup
+        # Keep applications whose applicant has a profile; the rest are dropped
+        ranked_applications: List[Dict[str, Any]] = []
+        for app in applications:
+            cand_id = app.get("candidateId")
+            if cand_id not in scores:
+                logger.warning("Profile not found for candidate %s in application %s", cand_id, app.get('_id'))
+                continue
+            ranked_applications.append(app)
+        
+        # Paginate before loading display fields, so only the returned page is decoded and validated.
+        # A bounded heap selects the top end_idx in O(N log k) instead of sorting every applicant.
+        start_idx = (page - 1) * count
+        end_idx = start_idx + count
+        page_applications = heapq.nlargest(
+            end_idx,
+            ranked_applications,
+            key=lambda app: scores[app["candidateId"]] or -1.0,
+        )[start_idx:]
+        
+        # Only now load the page's full application rows and profile display fields, concurrently
+        page_hits, page_application_docs = await asyncio.gather(
+            self._fetch_profile_hits(
+                candidate_ids=[app["candidateId"] for app in page_applications],
+                scores=scores,
+            ),
+            self._fetch_applications_by_id([app["_id"] for app in page_applications]),
+        )
+        
+        # Create a map of user_id -> SearchCandidateHit for easy lookup, keyed by the raw ObjectId
         # IMPORTANT: Key by user_id (which matches Application.candidateId), NOT candidate_id (which is UserProfile._id)
-        profile_map = {str(hit.user_id): hit for hit in ranked_hits if hit.user_id}
+        profile_map = {hit.user_id: hit for hit in page_hits if hit.user_id}
         
-        logger.debug(f"Mapped {len(profile_map)} profiles by user_id. Sample keys: {list(profile_map.keys())[:3]}")
+        logger.debug("Mapped %s profiles by user_id. Sample keys: %s", len(profile_map), list(profile_map.keys())[:3])
         
         # Merge Application Data with User Profile Data
-        results: List[AppliedCandidateHit] = []
+        paginated_results: List[AppliedCandidateHit] = []
         
-        for app in applications:
-            cand_id = str(app.get("candidateId"))
+        for ranked_app in page_applications:
+            app = page_application_docs.get(ranked_app["_id"])
+            if app is None:
+                # Application withdrawn or moved out of "Applied" since it was ranked
+                continue
+            cand_id = app.get("candidateId")
             profile = profile_map.get(cand_id)
             
-            # Skip if profile not found (shouldn't happen if data is consistent)
+            # Skip if profile vanished between the scoring and display queries
             if not profile:
-                logger.warning(f"Profile not found for candidate {cand_id} in application {app.get('_id')}")
+                logger.warning("Profile not found for candidate %s in application %s", cand_id, app.get('_id'))
                 continue
                 
-            # Map Application fields
-            initial_questions = []
-            if "initialQuestionsAnswers" in app:
-                for qa in app["initialQuestionsAnswers"]:
-                    initial_questions.append(InitialQuestionAnswer(
-                        question=qa.get("question", ""),
-                        candidate_answer=qa.get("candidateAnswer"),
-                        expected_answer=qa.get("expectedAnswer"),
-                        _id=qa.get("_id")
-                    ))
-            
-            ruthi_stages = []
-            if "ruthiSideStages" in app:
-                for stage in app["ruthiSideStages"]:
-                    timestamps = None
-                    if "timestamps" in stage:
-                        ts = stage["timestamps"]
-                        timestamps = StageTimestamp(
-                            updated_at=ts.get("updatedAt"),
-                            created_at=ts.get("createdAt"),
-                            _id=ts.get("_id")
-                        )
-                    
-                    ruthi_stages.append(RuthiSideStage(
-                        name=stage.get("name", ""),
-                        order=stage.get("order", 0),
-                        is_completed=stage.get("isCompleted", False),
-                        timestamps=timestamps,
-                        _id=stage.get("_id")
-                    ))
-            
             # Determine job status (Fresher vs Experienced)
             job_status = "Fresher"
             if profile.current_job_title:
-                # Need to find company name from experience list
-                company = "Unknown Company"
-                if profile.experience:
-                    # Find the experience entry that matches current job title
-                    for exp in profile.experience:
-                        if exp.job_title == profile.current_job_title:
-                            company = exp.company_name or company
-                            break
-                    # Fallback to first experience if no match found but title exists
-                    if company == "Unknown Company" and profile.experience:
-                         company = profile.experience[0].company_name or company
+                # current_job_title is taken from experience[0], so its company is on that entry
+                company = profile.experience[0].company_name or "Unknown Company"
                 
                 job_status = f"{profile.current_job_title} at {company}"
             elif profile.experience:
@@ -177,37 +251,29 @@ class SearchService:
                  latest = profile.experience[0]
                  job_status = f"{latest.job_title} at {latest.company_name}"
 
-            # Construct the combined hit
-            hit = AppliedCandidateHit(
-                _id=app.get("_id"),
-                candidateId=app.get("candidateId"),
-                jobId=app.get("jobId"),
+            # Construct the combined hit without re-validating fields we derived or read from Mongo;
+            # only the raw aliased sub-documents go through their compiled list adapters
+            paginated_results.append(AppliedCandidateHit.model_construct(
+                application_id=app.get("_id"),
+                candidate_id=app.get("candidateId"),
+                job_id=app.get("jobId"),
                 full_name=profile.full_name,
                 job_status=job_status,
                 skills=profile.skills,
-                initialQuestionsAnswers=initial_questions,
-                currentStatus=app.get("currentStatus", "Applied"),
-                ruthiSideStages=ruthi_stages,
-                movedToRecruiter=app.get("movedToRecruiter", False),
+                initial_questions_answers=_validate_items(QUESTION_LIST_ADAPTER, InitialQuestionAnswer, app.get("initialQuestionsAnswers")),
+                current_status=app.get("currentStatus", "Applied"),
+                ruthi_side_stages=_validate_items(STAGE_LIST_ADAPTER, RuthiSideStage, app.get("ruthiSideStages")),
+                moved_to_recruiter=app.get("movedToRecruiter", False),
                 notes=app.get("notes", ""),
-                appliedAt=app.get("appliedAt"),
-                recruiterSideStages=app.get("recruiterSideStages", []),
+                applied_at=app.get("appliedAt"),
+                recruiter_side_stages=app.get("recruiterSideStages", []),
                 documents=app.get("documents", []),
-                createdAt=app.get("createdAt"),
-                updatedAt=app.get("updatedAt"),
-                similarity_score=profile.similarity_score
-            )
-            results.append(hit)
-        
-        # Sort final results by similarity score descending
-        results.sort(key=lambda x: x.similarity_score or -1.0, reverse=True)
-        
-        # Apply pagination to the ranked results
-        start_idx = (page - 1) * count
-        end_idx = start_idx + count
-        paginated_results = results[start_idx:end_idx]
+                created_at=app.get("createdAt"),
+                updated_at=app.get("updatedAt"),
+                similarity_score=profile.similarity_score,
+            ))
         
-        logger.info(f"Constructed {len(results)} total results, returning page {page} ({len(paginated_results)} items)")
+        logger.info("Ranked %s total results, returning page %s (%s items)", len(ranked_applications), page, len(paginated_results))
         
         pagination = PaginationMeta(page=page, page_size=count, total_matches=total)
         return NewAppliedSearchResponse(
@@ -232,27 +298,33 @@ class SearchService:
         Raises:
             NotFoundError: If job doesn't exist
         """
-        logger.info(f"Starting global search for job {job_id}, count={count}")
+        logger.info("Starting global search for job %s, count=%s", job_id, count)
         
         # Get job and ensure it has an embedding
-        job = await self._get_job_or_404(job_id)
-        jd_embedding, meta = await self._ensure_job_embedding(job)
+        jd_embedding, meta = await self._load_job_embedding(job_id)
 
         # Determine result count
-        requested = count or self._settings.DEFAULT_GLOBAL_LIMIT
-        requested = max(1, min(requested, self._settings.MAX_GLOBAL_LIMIT))
+        requested = count or self._default_global_limit
+        requested = max(1, min(requested, self._max_global_limit))
         
-        logger.debug(f"Requesting {requested} global candidates for job {job_id}")
+        logger.debug("Requesting %s global candidates for job %s", requested, job_id)
 
-        # Rank candidates via vector search (no filtering by application)
-        ranked_hits = await self._rank_candidates_via_vector_search(
-            jd_embedding=jd_embedding,
-            candidate_scope="global",
-            candidate_ids=None,
-            limit=requested,
-        )
+        # Hits are frozen models, so a cached ranking can be returned as-is without re-hydration
+        cache_key = (jd_embedding.tobytes(), requested)
+        ranked_hits = self._global_results.get(cache_key) if self._global_results is not None else None
+        if ranked_hits is None:
+            # Rank candidates via vector search (no filtering by application)
+            ranked_hits = await self._rank_candidates_via_vector_search(
+                jd_embedding=jd_embedding,
+                candidate_scope="global",
+                limit=requested,
+            )
+            if self._global_results is not None:
+                self._global_results.put(cache_key, ranked_hits)
+        else:
+            logger.debug("Reusing cached global ranking for job %s", job_id)
         
-        logger.info(f"Found {len(ranked_hits)} global candidates for job {job_id}")
+        logger.info("Found %s global candidates for job %s", len(ranked_hits), job_id)
 
         return GlobalSearchResponse(
             job_id=job_id,
@@ -262,6 +334,11 @@ class SearchService:
             embedding_model=meta["model"],
         )
 
+    async def _load_job_embedding(self, job_id: str) -> tuple[np.ndarray, Dict[str, Any]]:
+        """Fetch the job (404 if missing) and return its embedding and metadata."""
+        job = await self._get_job_or_404(job_id)
+        return await self._ensure_job_embedding(job)
+
     async def _get_job_or_404(self, job_id: str) -> Dict[str, Any]:
         """
         Retrieve job or raise 404 error.
@@ -275,20 +352,19 @@ class SearchService:
         Raises:
             NotFoundError: If job doesn't exist or ID is invalid
         """
-        try:
-            object_id = ObjectId(job_id)
-        except InvalidId as exc:
-            logger.warning(f"Invalid job ID format: {job_id}")
-            raise NotFoundError(f"Job with id {job_id} not found") from exc
+        object_id = _to_object_id(job_id)
+        if object_id is None:
+            logger.warning("Invalid job ID format: %s", job_id)
+            raise NotFoundError(f"Job with id {job_id} not found")
         
-        job = await self._jobs.find_one({"_id": object_id})
+        job = await self._jobs.find_one({"_id": object_id}, JOB_EMBEDDING_PROJECTION)
         if not job:
-            logger.warning(f"Job not found: {job_id}")
+            logger.warning("Job not found: %s", job_id)
             raise NotFoundError(f"Job with id {job_id} not found")
         
         return job
 
-    async def _ensure_job_embedding(self, job_doc: Dict[str, Any]) -> tuple[List[float], Dict[str, Any]]:
+    async def _ensure_job_embedding(self, job_doc: Dict[str, Any]) -> tuple[np.ndarray, Dict[str, Any]]:
         """
         Ensure job has a valid embedding, generating if necessary.
         
@@ -296,81 +372,97 @@ class SearchService:
             job_doc: Job document
             
         Returns:
-            Tuple of (embedding vector, metadata dict with cache_hit and model)
+            Tuple of (unit-length float32 embedding vector, metadata dict with cache_hit and model)
         """
         job_id = str(job_doc["_id"])
         
         # Use job_listing_service to ensure embedding
         try:
+            # Already unit length (and cached in-process by the job service), so both the
+            # $vectorSearch dotProduct index and the manual ranker can use it as-is
             vector = await self._job_service.ensure_embedding(job_doc)
             
             # Determine if this was a cache hit
-            last_generated = job_doc.get("job_embedding_last_generated_at")
-            updated_at = job_doc.get("updatedAt")
+            last_generated = as_utc(job_doc.get("job_embedding_last_generated_at"))
+            updated_at = as_utc(job_doc.get("updatedAt"))
             cache_hit = bool(
                 last_generated and (not updated_at or last_generated >= updated_at)
             )
             
-            logger.debug(f"Job {job_id} embedding: cache_hit={cache_hit}")
+            logger.debug("Job %s embedding: cache_hit=%s", job_id, cache_hit)
             
             return vector, {
                 "cache_hit": cache_hit,
                 "model": job_doc.get("job_embedding_model"),
             }
         except Exception as exc:
-            logger.error(f"Failed to ensure job embedding for {job_id}: {exc}")
+            logger.error("Failed to ensure job embedding for %s: %s", job_id, exc)
             raise
 
-    async def _fetch_applications(
-        self, job_id: str, *, page: int, page_size: int
-    ) -> tuple[List[Dict[str, Any]], int]:
+    async def _fetch_applications_with_vectors(self, job_id: str) -> List[Dict[str, Any]]:
         """
-        Fetch full application documents for a job.
+        Fetch the ID of every applied application for a job with its applicant's embedding joined in.
         
         Args:
             job_id: Job identifier
-            page: Page number (1-indexed)
-            page_size: Results per page
             
         Returns:
-            Tuple of (list of application documents, total count)
+            {_id, candidateId, profiles} documents, where profiles holds the applicant's scoring
+            fields (empty when the applicant has no profile)
+            
+        Raises:
+            NotFoundError: If the job ID is invalid
         """
-        try:
-            job_object_id = ObjectId(job_id)
-        except InvalidId as exc:
-            raise NotFoundError(f"Job with id {job_id} not found") from exc
-
-        query = {"jobId": job_object_id, "currentStatus": "Applied"}
-        total = await self._applications.count_documents(query)
-        
-        if total == 0:
-            logger.debug(f"No applications found for job {job_id}")
-            return [], 0
-
-        if page_size > 0:
-            skip = max(page - 1, 0) * page_size
-            cursor = (
-                self._applications.find(query)
-                .skip(skip)
-                .limit(page_size)
-            )
-            docs = await cursor.to_list(length=page_size)
-        else:
-            # Fetch all documents if page_size is 0
-            cursor = self._applications.find(query)
-            docs = await cursor.to_list(length=None)
-        
-        logger.info(f"Fetched {len(docs)} applications for job {job_id}")
-        return docs, total
+        job_object_id = _to_object_id(job_id)
+        if job_object_id is None:
+            raise NotFoundError(f"Job with id {job_id} not found")
 
+        # One round-trip replaces count + find(applications) + find(userprofiles).
+        # Only IDs and scoring fields travel for every applicant; the full application rows and
+        # profile display fields are loaded for the returned page only.
+        pipeline = [
+            {"$match": {"jobId": job_object_id, "currentStatus": "Applied"}},
+            {"$project": {"_id": 1, "candidateId": 1}},
+            {
+                "$lookup": {
+                    "from": self._userprofiles.name,
+                    "localField": "candidateId",
+                    "foreignField": "user",
+                    "pipeline": [{"$project": _SCORING_PROJECTION}],
+                    "as": "profiles",
+                }
+            },
+        ]
+        cursor = await self._applications.aggregate(pipeline)
+        docs = await cursor.to_list(length=None)
+        
+        logger.info("Fetched %s applications for job %s", len(docs), job_id)
+        return docs
 
+    async def _fetch_applications_by_id(self, application_ids: List[ObjectId]) -> Dict[ObjectId, Dict[str, Any]]:
+        """
+        Load the displayed application fields for one ranked page.
+        
+        Args:
+            application_ids: Application ObjectIds
+            
+        Returns:
+            Mapping of application _id -> document (still in "Applied" status)
+        """
+        if not application_ids:
+            return {}
+        cursor = self._applications.find(
+            {"_id": {"$in": application_ids}, "currentStatus": "Applied"},
+            _APPLICATION_PAGE_PROJECTION,
+        )
+        docs = await cursor.to_list(length=len(application_ids))
+        return {doc["_id"]: doc for doc in docs}
 
     async def _rank_candidates_via_vector_search(
         self,
-        jd_embedding: List[float],
+        jd_embedding: np.ndarray,
         *,
         candidate_scope: str,
-        candidate_ids: Optional[List[str]] = None,
         limit: Optional[int] = None,
     ) -> List[SearchCandidateHit]:
         """
@@ -379,7 +471,6 @@ class SearchService:
         Args:
             jd_embedding: Job description embedding vector
             candidate_scope: "applied" or "global"
-            candidate_ids: Optional list of candidate IDs to filter by
             limit: Maximum results to return
             
         Returns:
@@ -388,369 +479,172 @@ class SearchService:
         if self._userprofiles is None:
             raise RuntimeError("User profiles collection not configured for SearchService.")
 
-        limit = limit or self._settings.DEFAULT_GLOBAL_LIMIT
-        
-        # Convert candidate IDs to ObjectIds
-        object_ids = []
-        if candidate_ids:
-            logger.info(f"Converting {len(candidate_ids)} candidate IDs to ObjectIds")
-            for candidate_id in candidate_ids:
-                try:
-                    obj_id = ObjectId(candidate_id)
-                    object_ids.append(obj_id)
-                except InvalidId:
-                    logger.warning(f"Invalid candidate ID format: {candidate_id}")
-                    continue
-            logger.info(f"Successfully converted {len(object_ids)} candidate IDs to ObjectIds")
-            logger.info(f"Sample ObjectIds: {object_ids[:3]}...")
-
+        limit = limit or self._default_global_limit
+        
         # Build aggregation pipeline
         pipeline: List[Dict[str, Any]] = []
         
         # Vector search stage (MUST be first stage)
-        # For applied search, we'll use $match AFTER $vectorSearch to filter by candidate IDs
-        # This avoids requiring _id to be indexed as a filter field in the vector search index
-        
-        # Calculate how many results to fetch from vector search
-        # If filtering by candidate IDs, fetch more results to account for filtering
-        vector_search_limit = limit
-        if object_ids:
-            # Fetch 3x the limit to ensure we have enough results after filtering
-            # This helps when the applied candidates are not the top matches
-            vector_search_limit = min(limit * 3, 500)
-            logger.debug(f"Fetching {vector_search_limit} results from vector search, will filter to {len(object_ids)} candidate IDs")
-        
         vector_search_stage = {
-            "index": self._settings.USERPROFILE_VECTOR_INDEX,
+            "index": self._vector_index,
             "path": "embedding_vector",
-            "queryVector": jd_embedding,
-            "limit": vector_search_limit,
-            "numCandidates": max(vector_search_limit * 2, 200),
+            "queryVector": jd_embedding.tolist(),
+            "limit": limit,
+            "numCandidates": max(limit * 2, 200),
         }
         
         pipeline.append({"$vectorSearch": vector_search_stage})
         
-        # Add $match stage AFTER $vectorSearch to filter by candidate IDs
-        # This works without requiring 'user' to be indexed as a filter field
-        # IMPORTANT: Match on 'user' field, not '_id', because ApplicationCollection.candidateId 
-        # references userprofiles.user, not userprofiles._id
-        if object_ids:
-            match_stage = {
-                "$match": {
-                    "user": {"$in": object_ids}  # Match on 'user' field, not '_id'
-                }
-            }
-            pipeline.append(match_stage)
-            logger.info(f"Added post-filter for {len(object_ids)} candidate IDs (matching on 'user' field)")
-            logger.info(f"Match filter: {match_stage}")
-        
-        # Limit results after filtering
-        pipeline.append({"$limit": limit})
-        
         # Project comprehensive candidate fields
         pipeline.append(
             {
                 "$project": {
-                    "_id": 1,
-                    "user": 1,
-                    "personal_information": 1,
-                    "socials": 1,
-                    "skills": 1,
-                    "experience": 1,
-                    "education": 1,
-                    "location": 1,
-                    "embedding_model": 1,
-                    "embedding_last_generated_at": 1,
+                    **SEARCH_HIT_PROJECTION,
                     "score": {"$meta": "vectorSearchScore"},
                 }
             }
         )
 
-        logger.info(f"Executing vector search with vector_limit={vector_search_limit}, final_limit={limit}, scope={candidate_scope}")
-        logger.info(f"Full aggregation pipeline: {pipeline}")
+        logger.info("Executing vector search with limit=%s, scope=%s", limit, candidate_scope)
+        # The query vector is thousands of floats; log its size instead
+        logged_stage = {**vector_search_stage, "queryVector": f"<{len(jd_embedding)} floats>"}
+        logger.debug("Aggregation pipeline: %s", [{"$vectorSearch": logged_stage}, *pipeline[1:]])
         
-        # Execute aggregation
-        cursor = self._userprofiles.aggregate(pipeline)
-        documents = await cursor.to_list(length=limit)
+        # Execute aggregation, building hits as batches arrive so decode overlaps the next fetch
+        results: List[SearchCandidateHit] = []
+        cursor = await self._userprofiles.aggregate(pipeline, batchSize=_VECTOR_SEARCH_BATCH_SIZE)
+        async for doc in cursor:
+            # Convert to SearchCandidateHit with comprehensive information
+            results.append(self._build_candidate_hit(doc, score=doc.get("score"), source=candidate_scope))
         
-        logger.info(f"Vector search returned {len(documents)} documents")
-        if len(documents) == 0 and object_ids:
-            logger.warning(f"⚠️  Vector search returned 0 documents despite filtering for {len(object_ids)} candidate IDs!")
-            logger.warning(f"This suggests candidates either lack embeddings or IDs don't match userprofiles._id")
+        logger.info("Vector search returned %s documents", len(results))
 
-        # Convert to SearchCandidateHit objects with comprehensive information
-        results: List[SearchCandidateHit] = []
-        for doc in documents:
-            personal = doc.get("personal_information") or {}
-            socials = doc.get("socials") or {}
-            location_value = doc.get("location") or personal.get("location")
-            
-            # Extract personal information
-            full_name = personal.get("full_name") or f"{personal.get('first_name', '')} {personal.get('last_name', '')}".strip()
-            
-            # Get current job info from most recent experience
-            experiences_raw = doc.get("experience", [])
-            current_job_title = None
-            employment_status = None
-            if experiences_raw and isinstance(experiences_raw, list) and len(experiences_raw) > 0:
-                # Check if first experience is current
-                latest_exp = experiences_raw[0]
-                if isinstance(latest_exp, dict):
-                    # Extract title from 'position' field first, fallback to 'role' or 'title'
-                    current_job_title = latest_exp.get("position") or latest_exp.get("role") or latest_exp.get("title")
-                    # Check if this is a current position
-                    end_date_raw = latest_exp.get("end_date") or latest_exp.get("endDate")
-                    # Position is current if end_date is None, or if it's a string saying "present"
-                    is_current_position = (
-                        not end_date_raw or 
-                        (isinstance(end_date_raw, str) and end_date_raw.lower() == "present")
-                    )
-                    if is_current_position:
-                        employment_status = "Currently Working"
-                    else:
-                        employment_status = "Open to Opportunities"
-            
-            # Extract contact info
-            contact_info = ContactInfo(
-                email=personal.get("email"),
-                phone=personal.get("phone") or personal.get("phone_number"),
-                github=socials.get("github"),
-                linkedin=socials.get("linkedin")
-            )
-            
-            # Extract skills with proficiency levels
-            skills_list = []
-            skills_raw = doc.get("skills", [])
-            if isinstance(skills_raw, list):
-                for skill in skills_raw:
-                    if isinstance(skill, str):
-                        skills_list.append(SkillDetail(skill_name=skill, proficiency_level=None))
-                    elif isinstance(skill, dict):
-                        skill_name = skill.get("skill_name") or skill.get("name")
-                        # MongoDB stores as 'skill_proficiency', check that first
-                        proficiency = (
-                            skill.get("skill_proficiency") or 
-                            skill.get("proficiency_level") or 
-                            skill.get("proficiency") or 
-                            skill.get("level")
-                        )
-                        if skill_name:
-                            skills_list.append(SkillDetail(skill_name=skill_name, proficiency_level=proficiency))
-            
-            # Extract experience details
-            experience_list = []
-            if isinstance(experiences_raw, list):
-                for exp in experiences_raw:
-                    if isinstance(exp, dict):
-                        # Format duration - handle datetime objects from MongoDB
-                        start_date_raw = exp.get("start_date") or exp.get("startDate")
-                        end_date_raw = exp.get("end_date") or exp.get("endDate")
-                        
-                        # Convert datetime objects to strings
-                        if isinstance(start_date_raw, dt):
-                            start_date = start_date_raw.strftime("%b %Y")  # e.g., "Jun 2022"
-                        else:
-                            start_date = str(start_date_raw) if start_date_raw else ""
-                        
-                        if isinstance(end_date_raw, dt):
-                            end_date = end_date_raw.strftime("%b %Y")
-                        elif not end_date_raw:
-                            end_date = "Present"
-                        else:
-                            end_date = str(end_date_raw)
-                        
-                        duration = f"{start_date} - {end_date}" if start_date else None
-                        
-                        is_current = not end_date_raw or (isinstance(end_date_raw, str) and end_date_raw.lower() == "present")
-                        
-                        experience_list.append(ExperienceDetail(
-                            company_name=exp.get("company") or exp.get("company_name"),
-                            job_title=exp.get("position") or exp.get("role") or exp.get("title"),
-                            duration=duration,
-                            start_date=start_date,
-                            end_date=end_date,
-                            description=exp.get("description"),
-                            is_current=is_current
-                        ))
+        logger.debug("Ranked %s candidates", len(results))
+        return results
+
+    @staticmethod
+    def _build_candidate_hit(doc: Dict[str, Any], *, score: Optional[float], source: str) -> SearchCandidateHit:
+        """
+        Build a search hit from a userprofile document projected with SEARCH_HIT_PROJECTION.
+        
+        Args:
+            doc: Userprofile document
+            score: Similarity score to report
+            source: "applied" or "global"
             
-            hit = SearchCandidateHit(
-                candidate_id=doc["_id"],
-                user_id=doc.get("user"),
-                full_name=full_name,
-                current_job_title=current_job_title,
-                employment_status=employment_status,
-                location=location_value,
-                contact_info=contact_info,
-                skills=skills_list,
-                skills_count=len(skills_list),
-                experience=experience_list,
-                experience_count=len(experience_list),
-                similarity_score=doc.get("score"),
-                source=candidate_scope,
-                embedding_model=doc.get("embedding_model"),
-                embedding_generated_at=doc.get("embedding_last_generated_at"),
-            )
-            results.append(hit)
+        Returns:
+            Search hit; the outer model uses model_construct since its fields are derived here
+        """
+        personal = doc.get("personal_information") or {}
+        socials = doc.get("socials") or {}
+        location_value = doc.get("location") or personal.get("location")
 
-        logger.debug(f"Ranked {len(results)} candidates")
-        return results
+        # Extract personal information
+        full_name = personal.get("full_name") or f"{personal.get('first_name', '')} {personal.get('last_name', '')}".strip()
+
+        # Extract contact info
+        contact_info = ContactInfo.model_construct(
+            email=personal.get("email"),
+            phone=personal.get("phone") or personal.get("phone_number"),
+            github=socials.get("github"),
+            linkedin=socials.get("linkedin")
+        )
+
+        # Skills and experience are decoded by pydantic-core straight from the raw lists
+        skills_list = _validate_items(SKILL_LIST_ADAPTER, SkillDetail, doc.get("skills"))
+        experience_list = _validate_items(EXPERIENCE_LIST_ADAPTER, ExperienceDetail, doc.get("experience"))
+
+        # Current job info comes from the most recent experience, whose title variants and
+        # is_current were already resolved by ExperienceDetail
+        current_job_title = None
+        employment_status = None
+        if experience_list:
+            latest_exp = experience_list[0]
+            current_job_title = latest_exp.job_title
+            employment_status = "Currently Working" if latest_exp.is_current else "Open to Opportunities"
+        
+        return SearchCandidateHit.model_construct(
+            candidate_id=doc["_id"],
+            user_id=doc.get("user"),
+            full_name=full_name,
+            current_job_title=current_job_title,
+            employment_status=employment_status,
+            location=location_value,
+            contact_info=contact_info,
+            skills=skills_list,
+            skills_count=len(skills_list),
+            experience=experience_list,
+            experience_count=len(experience_list),
+            similarity_score=score,
+            source=source,
+            embedding_model=doc.get("embedding_model"),
+            embedding_generated_at=doc.get("embedding_last_generated_at"),
+        )
+
+    @staticmethod
+    def _score_profiles_manually(
+        jd_embedding: np.ndarray,
+        profiles: List[Dict[str, Any]],
+    ) -> Dict[ObjectId, float]:
+        """
+        Score applicant profiles against the JD without loading their display fields.
+        Used for applied search to ensure all applicants are ranked regardless of vector search limits.
+        
+        Args:
+            jd_embedding: Unit-length job description embedding
+            profiles: Profile documents projected with _SCORING_PROJECTION
+            
+        Returns:
+            Mapping of user ObjectId -> cosine similarity (0.0 for profiles without an embedding)
+        """
+        # Stored embeddings and the JD vector are unit length, so cosine similarity is a plain dot product.
+        # Score every embedded profile with one (N, D) @ (D,) product; profiles without a vector score 0
+        scores = np.zeros(len(profiles), dtype=np.float32)
+        quantized = [i for i, doc in enumerate(profiles) if doc.get("embedding_int8")]
+        legacy = [
+            i for i, doc in enumerate(profiles)
+            if not doc.get("embedding_int8") and doc.get("embedding_vector")
+        ]
+        if quantized:
+            # One contiguous (N, D) int8 block; widened to float32 so the product still runs on BLAS,
+            # then each row is rescaled by its own quantization scale
+            codes = np.frombuffer(
+                b"".join(profiles[i]["embedding_int8"] for i in quantized), dtype=np.int8
+            ).reshape(len(quantized), -1)
+            row_scales = np.array([profiles[i]["embedding_scale"] for i in quantized], dtype=np.float32)
+            scores[quantized] = (codes.astype(np.float32) @ jd_embedding) * row_scales
+        if legacy:
+            matrix = np.stack([as_float32(profiles[i]["embedding_vector"]) for i in legacy])
+            scores[legacy] = matrix @ jd_embedding
+        
+        return {
+            doc["user"]: score
+            for doc, score in zip(profiles, scores.tolist())
+            if doc.get("user")
+        }
 
-    async def _fetch_and_rank_profiles_manually(
+    async def _fetch_profile_hits(
         self,
-        jd_embedding: List[float],
-        candidate_ids: List[str],
+        candidate_ids: List[ObjectId],
+        scores: Dict[ObjectId, float],
     ) -> List[SearchCandidateHit]:
         """
-        Fetch profiles by ID and rank them manually using cosine similarity.
-        Used for applied search to ensure all applicants are returned regardless of vector search limits.
+        Fetch display fields for already-ranked applicants and build their search hits.
+        
+        Args:
+            candidate_ids: User ObjectIds to load, typically one result page
+            scores: Precomputed user_id -> similarity scores
+            
+        Returns:
+            Search hits in collection order; callers order them by score
         """
         if not candidate_ids:
             return []
-            
-        # Convert IDs to ObjectIds
-        object_ids = []
-        for cid in candidate_ids:
-            try:
-                object_ids.append(ObjectId(cid))
-            except InvalidId:
-                continue
-                
-        # Fetch all profiles directly
-        cursor = self._userprofiles.find({"user": {"$in": object_ids}})
-        documents = await cursor.to_list(length=len(object_ids))
-        
-        logger.info(f"Manually fetched {len(documents)} profiles for ranking")
-        
-        # Calculate cosine similarity manually
-        import numpy as np
-        from numpy.linalg import norm
-        
-        results = []
-        jd_vec = np.array(jd_embedding)
-        jd_norm = norm(jd_vec)
-        
-        for doc in documents:
-            # Calculate score
-            score = 0.0
-            if "embedding_vector" in doc and doc["embedding_vector"]:
-                cand_vec = np.array(doc["embedding_vector"])
-                cand_norm = norm(cand_vec)
-                if jd_norm > 0 and cand_norm > 0:
-                    score = float(np.dot(jd_vec, cand_vec) / (jd_norm * cand_norm))
-            
-            # Add score to doc for processing
-            doc["score"] = score
-            
-            # Process document into SearchCandidateHit (reuse logic)
-            personal = doc.get("personal_information") or {}
-            socials = doc.get("socials") or {}
-            location_value = doc.get("location") or personal.get("location")
-            
-            # Extract personal information
-            full_name = personal.get("full_name") or f"{personal.get('first_name', '')} {personal.get('last_name', '')}".strip()
-            
-            # Get current job info from most recent experience
-            experiences_raw = doc.get("experience", [])
-            current_job_title = None
-            employment_status = None
-            if experiences_raw and isinstance(experiences_raw, list) and len(experiences_raw) > 0:
-                # Check if first experience is current
-                latest_exp = experiences_raw[0]
-                if isinstance(latest_exp, dict):
-                    # Extract title from 'position' field first, fallback to 'role' or 'title'
-                    current_job_title = latest_exp.get("position") or latest_exp.get("role") or latest_exp.get("title")
-                    # Check if this is a current position
-                    end_date_raw = latest_exp.get("end_date") or latest_exp.get("endDate")
-                    # Position is current if end_date is None, or if it's a string saying "present"
-                    is_current_position = (
-                        not end_date_raw or 
-                        (isinstance(end_date_raw, str) and end_date_raw.lower() == "present")
-                    )
-                    if is_current_position:
-                        employment_status = "Currently Working"
-                    else:
-                        employment_status = "Open to Opportunities"
-            
-            # Extract contact info
-            contact_info = ContactInfo(
-                email=personal.get("email"),
-                phone=personal.get("phone") or personal.get("phone_number"),
-                github=socials.get("github"),
-                linkedin=socials.get("linkedin")
-            )
-            
-            # Extract skills with proficiency levels
-            skills_list = []
-            skills_raw = doc.get("skills", [])
-            if isinstance(skills_raw, list):
-                for skill in skills_raw:
-                    if isinstance(skill, str):
-                        skills_list.append(SkillDetail(skill_name=skill, proficiency_level=None))
-                    elif isinstance(skill, dict):
-                        skill_name = skill.get("skill_name") or skill.get("name")
-                        # MongoDB stores as 'skill_proficiency', check that first
-                        proficiency = (
-                            skill.get("skill_proficiency") or 
-                            skill.get("proficiency_level") or 
-                            skill.get("proficiency") or 
-                            skill.get("level")
-                        )
-                        if skill_name:
-                            skills_list.append(SkillDetail(skill_name=skill_name, proficiency_level=proficiency))
-            
-            # Extract experience details
-            experience_list = []
-            if isinstance(experiences_raw, list):
-                for exp in experiences_raw:
-                    if isinstance(exp, dict):
-                        # Format duration - handle datetime objects from MongoDB
-                        start_date_raw = exp.get("start_date") or exp.get("startDate")
-                        end_date_raw = exp.get("end_date") or exp.get("endDate")
-                        
-                        # Convert datetime objects to strings
-                        if isinstance(start_date_raw, dt):
-                            start_date = start_date_raw.strftime("%b %Y")  # e.g., "Jun 2022"
-                        else:
-                            start_date = str(start_date_raw) if start_date_raw else ""
-                        
-                        if isinstance(end_date_raw, dt):
-                            end_date = end_date_raw.strftime("%b %Y")
-                        elif not end_date_raw:
-                            end_date = "Present"
-                        else:
-                            end_date = str(end_date_raw)
-                        
-                        duration = f"{start_date} - {end_date}" if start_date else None
-                        
-                        is_current = not end_date_raw or (isinstance(end_date_raw, str) and end_date_raw.lower() == "present")
-                        
-                        experience_list.append(ExperienceDetail(
-                            company_name=exp.get("company") or exp.get("company_name"),
-                            job_title=exp.get("position") or exp.get("role") or exp.get("title"),
-                            duration=duration,
-                            start_date=start_date,
-                            end_date=end_date,
-                            description=exp.get("description"),
-                            is_current=is_current
-                        ))
-            
-            hit = SearchCandidateHit(
-                candidate_id=doc["_id"],
-                user_id=doc.get("user"),
-                full_name=full_name,
-                current_job_title=current_job_title,
-                employment_status=employment_status,
-                location=location_value,
-                contact_info=contact_info,
-                skills=skills_list,
-                skills_count=len(skills_list),
-                experience=experience_list,
-                experience_count=len(experience_list),
-                similarity_score=score,
-                source="applied",
-                embedding_model=doc.get("embedding_model"),
-                embedding_generated_at=doc.get("embedding_last_generated_at"),
-            )
-            results.append(hit)
-            
-        return results
+        
+        cursor = self._userprofiles.find({"user": {"$in": candidate_ids}}, SEARCH_HIT_PROJECTION)
+        documents = await cursor.to_list(length=len(candidate_ids))
+        
+        return [
+            self._build_candidate_hit(doc, score=scores.get(doc.get("user"), 0.0), source="applied")
+            for doc in documents
+        ]
@@ -2,15 +2,19 @@
 User profile service with comprehensive embedding management.
 Handles candidate profile CRUD operations and embedding generation/refresh.
 """
-from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
 
-from bson import ObjectId
+from bson import Binary, ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
 
 from app.config.settings import Settings
 from app.services.base import NotFoundError
 from app.services.embedding_service import EmbeddingResult, EmbeddingService, EmbeddingServiceError
+from app.services.job_listing_service import PENDING_EMBEDDING_STATUSES
+from app.utils.dates import utcnow
 from app.utils.logger import get_logger
+from app.utils.vectors import quantize_int8, to_bson_vector
 
 logger = get_logger(__name__)
 
@@ -34,6 +38,39 @@ EMBEDDING_SENSITIVE_FIELDS = {
     "socials",
 }
 
+# Fields read to build the embedding text (EmbeddingService._build_candidate_text) plus the
+# status, so listing pending candidates never ships stored vectors or unrelated profile data
+CANDIDATE_EMBEDDING_PROJECTION = {
+    "_id": 1,
+    "personal_information": 1,
+    "skills": 1,
+    "experience": 1,
+    "summary": 1,
+    "about": 1,
+    "embedding_status": 1,
+}
+
+
+def _to_object_id(value: Union[str, ObjectId]) -> ObjectId:
+    # Callers holding a document's _id pass it through as-is instead of round-tripping via str
+    return value if isinstance(value, ObjectId) else ObjectId(value)
+
+
+def _store_full_name(personal: Any) -> None:
+    # Recomputed on every profile write that carries first/last name, so search hits can
+    # read personal_information.full_name instead of joining the parts per result
+    if not isinstance(personal, dict) or not ({"first_name", "last_name"} & personal.keys()):
+        return
+    full_name = f"{(personal.get('first_name') or '').strip()} {(personal.get('last_name') or '').strip()}".strip()
+    personal["full_name"] = full_name or None
+
+
+def _clear_partial_full_name(updates: Dict[str, Any]) -> None:
+    # A dotted first_name/last_name write only carries one part, so the stored full name
+    # is cleared and search falls back to joining the parts until the next full write
+    if {"personal_information.first_name", "personal_information.last_name"} & updates.keys():
+        updates["personal_information.full_name"] = None
+
 
 class UserProfileService:
     """Service for managing user profiles and their embeddings."""
@@ -54,10 +91,14 @@ class UserProfileService:
         Returns:
             Created profile ID
         """
-        now = datetime.utcnow()
+        now = utcnow()
+        _store_full_name(payload.get("personal_information"))
         payload.update({
+            # Every profile written here carries a status, so the pending query finds it by index
             "embedding_status": "pending",
             "embedding_vector": None,
+            "embedding_int8": None,
+            "embedding_scale": None,
             "embedding_model": None,
             "embedding_dimensions": self._settings.EMBEDDING_VECTOR_SIZE,
             "embedding_last_generated_at": None,
@@ -69,29 +110,33 @@ class UserProfileService:
         result = await self._collection.insert_one(payload)
         candidate_id = str(result.inserted_id)
         
-        logger.info(f"Created candidate profile: {candidate_id}")
+        logger.info("Created candidate profile: %s", candidate_id)
         # TODO: Enqueue background embedding job here
         return candidate_id
 
-    async def update_profile(self, candidate_id: str, updates: Dict[str, Any]) -> None:
+    async def update_profile(self, candidate_id: Union[str, ObjectId], updates: Dict[str, Any]) -> None:
         """
         Update a candidate profile.
         
         Args:
-            candidate_id: Candidate identifier
+            candidate_id: Candidate identifier (ObjectId or its hex string)
             updates: Fields to update
             
         Raises:
             NotFoundError: If candidate doesn't exist
         """
-        updates["updatedAt"] = datetime.utcnow()
+        updates["updatedAt"] = utcnow()
+        _store_full_name(updates.get("personal_information"))
+        _clear_partial_full_name(updates)
         
         # Check if updates affect embedding
         if self._touches_embedding_fields(updates):
-            logger.info(f"Update touches embedding fields for candidate {candidate_id}, marking as stale")
+            logger.info("Update touches embedding fields for candidate %s, marking as stale", candidate_id)
             updates.update({
                 "embedding_status": "stale",
                 "embedding_vector": None,
+                "embedding_int8": None,
+                "embedding_scale": None,
                 "embedding_error": None,
                 "embedding_last_generated_at": None,
                 "embedding_version": None,
@@ -99,34 +144,50 @@ class UserProfileService:
             # TODO: Enqueue background embedding job here
         
         result = await self._collection.update_one(
-            {"_id": ObjectId(candidate_id)},
+            {"_id": _to_object_id(candidate_id)},
             {"$set": updates}
         )
         
         if result.matched_count == 0:
-            logger.warning(f"Candidate not found for update: {candidate_id}")
+            logger.warning("Candidate not found for update: %s", candidate_id)
             raise NotFoundError(f"Candidate with id {candidate_id} not found")
         
-        logger.debug(f"Updated candidate profile: {candidate_id}")
+        logger.debug("Updated candidate profile: %s", candidate_id)
 
-    async def refresh_embedding(self, candidate_id: str) -> None:
+    async def refresh_embedding(self, candidate_id: Union[str, ObjectId]) -> None:
         """
         Generate or refresh embedding for a candidate.
         
         Args:
-            candidate_id: Candidate identifier
+            candidate_id: Candidate identifier (ObjectId or its hex string)
             
         Raises:
             NotFoundError: If candidate doesn't exist
             EmbeddingServiceError: If embedding generation fails
         """
-        logger.info(f"Starting embedding refresh for candidate: {candidate_id}")
+        logger.info("Starting embedding refresh for candidate: %s", candidate_id)
         
-        doc = await self._collection.find_one({"_id": ObjectId(candidate_id)})
+        doc = await self._collection.find_one({"_id": _to_object_id(candidate_id)})
         if not doc:
-            logger.warning(f"Candidate not found: {candidate_id}")
+            logger.warning("Candidate not found: %s", candidate_id)
             raise NotFoundError(f"Candidate with id {candidate_id} not found")
         
+        await self.refresh_embedding_for_doc(doc)
+
+    async def refresh_embedding_for_doc(self, doc: Dict) -> None:
+        """
+        Generate or refresh embedding for an already-loaded candidate document.
+        
+        Lets callers that just listed candidates (e.g. the backfill) skip the extra read.
+        
+        Args:
+            doc: Candidate document with the fields the embedding text is built from
+            
+        Raises:
+            EmbeddingServiceError: If embedding generation fails
+        """
+        candidate_id = doc["_id"]
+        
         # Update status to processing
         await self._collection.update_one(
             {"_id": doc["_id"]},
@@ -137,13 +198,13 @@ class UserProfileService:
                 }
             }
         )
-        logger.debug(f"Set candidate {candidate_id} embedding status to 'processing'")
+        logger.debug("Set candidate %s embedding status to 'processing'", candidate_id)
         
         try:
             result = await self._embedding_service.generate_candidate_embedding(doc)
-            logger.info(f"Successfully generated embedding for candidate {candidate_id}")
+            logger.info("Successfully generated embedding for candidate %s", candidate_id)
         except EmbeddingServiceError as exc:
-            logger.error(f"Embedding service error for candidate {candidate_id}: {exc}")
+            logger.error("Embedding service error for candidate %s: %s", candidate_id, exc)
             await self._collection.update_one(
                 {"_id": doc["_id"]},
                 {
@@ -155,7 +216,7 @@ class UserProfileService:
             )
             raise
         except Exception as exc:
-            logger.error(f"Unexpected error generating embedding for candidate {candidate_id}: {exc}", exc_info=True)
+            logger.error("Unexpected error generating embedding for candidate %s: %s", candidate_id, exc, exc_info=True)
             await self._collection.update_one(
                 {"_id": doc["_id"]},
                 {
@@ -168,14 +229,64 @@ class UserProfileService:
             raise
         else:
             await self._persist_embedding(doc["_id"], result)
-            logger.info(f"Persisted embedding for candidate {candidate_id}")
+            logger.info("Persisted embedding for candidate %s", candidate_id)
+
+    async def refresh_embeddings_for_docs(self, docs: List[Dict]) -> List[Optional[BaseException]]:
+        """
+        Refresh embeddings for a batch of already-loaded candidates with a single bulk write.
+        
+        All texts go to the embeddings API in as few requests as its batch limit allows; each
+        candidate's result, or its error status, is then written in one unordered bulk_write.
+        A candidate that fails only marks itself "error". The intermediate "processing"
+        status is skipped.
+        
+        Args:
+            docs: Candidate documents with the fields the embedding text is built from
+            
+        Returns:
+            Per-document outcome in input order: None on success, otherwise the exception
+        """
+        if not docs:
+            return []
+        
+        try:
+            results = await self._embedding_service.generate_candidate_embeddings(docs)
+        except Exception as exc:
+            logger.error("Batch embedding generation failed for %s candidates: %s", len(docs), exc, exc_info=True)
+            results = [exc] * len(docs)
+        
+        outcomes: List[Optional[BaseException]] = []
+        operations = []
+        for doc, result in zip(docs, results):
+            if isinstance(result, BaseException):
+                logger.error("Embedding generation failed for candidate %s: %s", doc["_id"], result)
+                error = str(result) if isinstance(result, EmbeddingServiceError) else f"Unexpected error: {result}"
+                fields = {"embedding_status": "error", "embedding_error": error}
+                outcomes.append(result)
+            else:
+                fields = self._embedding_fields(result)
+                outcomes.append(None)
+            operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": fields}))
+        
+        try:
+            await self._collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as exc:
+            logger.error("Bulk write failed for some of %s candidates: %s", len(docs), exc)
+            for write_error in exc.details.get("writeErrors", []):
+                outcomes[write_error["index"]] = exc
+        except PyMongoError as exc:
+            logger.error("Bulk write failed for %s candidates: %s", len(docs), exc)
+            return [exc] * len(docs)
+        
+        logger.info("Persisted embeddings for %s/%s candidates", outcomes.count(None), len(docs))
+        return outcomes
 
-    async def get_profile(self, candidate_id: str, *, include_embedding_vector: bool = False) -> Dict:
+    async def get_profile(self, candidate_id: Union[str, ObjectId], *, include_embedding_vector: bool = False) -> Dict:
         """
         Retrieve a candidate profile.
         
         Args:
-            candidate_id: Candidate identifier
+            candidate_id: Candidate identifier (ObjectId or its hex string)
             include_embedding_vector: Whether to include the embedding vector in response
             
         Returns:
@@ -184,16 +295,52 @@ class UserProfileService:
         Raises:
             NotFoundError: If candidate doesn't exist
         """
-        projection = None if include_embedding_vector else {"embedding_vector": 0}
-        profile = await self._collection.find_one({"_id": ObjectId(candidate_id)}, projection)
+        projection = None if include_embedding_vector else {"embedding_vector": 0, "embedding_int8": 0}
+        profile = await self._collection.find_one({"_id": _to_object_id(candidate_id)}, projection)
         
         if not profile:
-            logger.warning(f"Candidate not found: {candidate_id}")
+            logger.warning("Candidate not found: %s", candidate_id)
             raise NotFoundError(f"Candidate with id {candidate_id} not found")
         
-        logger.debug(f"Retrieved candidate profile: {candidate_id}")
+        logger.debug("Retrieved candidate profile: %s", candidate_id)
         return profile
 
+    async def ensure_indexes(self) -> None:
+        """
+        Create the index that serves the pending-embedding query.
+        
+        The index is not partial: candidates written without any embedding_status are
+        found through its null bounds as well.
+        """
+        await self._collection.create_index(
+            [("embedding_status", 1), ("_id", 1)],
+            name="embedding_status_id",
+        )
+        logger.info("Candidate embedding index ensured")
+
+    async def mark_missing_embeddings(self) -> int:
+        """
+        Flag candidates whose vector is gone despite a non-pending status as "missing".
+        
+        A collection scan; run from the backfill, never on the request path. Candidates with
+        no status at all need no marking, the pending query picks them up directly.
+        
+        Returns:
+            Number of candidates marked
+        """
+        result = await self._collection.update_many(
+            {
+                "$or": [
+                    {"embedding_vector": {"$exists": False}},
+                    {"embedding_vector": None},
+                ],
+                "embedding_status": {"$nin": [*PENDING_EMBEDDING_STATUSES, None]},
+            },
+            {"$set": {"embedding_status": "missing"}},
+        )
+        logger.info("Marked %s candidates as missing an embedding", result.modified_count)
+        return result.modified_count
+
     async def list_pending_embeddings(self, *, limit: int = 100) -> List[Dict]:
         """
         Find candidates that need embedding generation.
@@ -202,21 +349,47 @@ class UserProfileService:
             limit: Maximum number of candidates to return
             
         Returns:
-            List of candidate documents needing embeddings
+            List of candidate documents needing embeddings, limited to CANDIDATE_EMBEDDING_PROJECTION
         """
+        candidates = await self._pending_cursor(limit).to_list(length=limit)
+        
+        logger.info("Found %s candidates needing embeddings (limit: %s)", len(candidates), limit)
+        return candidates
+
+    async def iter_pending_embeddings(self, *, limit: int = 100, batch_size: int = 10) -> AsyncIterator[List[Dict]]:
+        """
+        Stream candidates that need embedding generation in batches.
+        
+        Same query as list_pending_embeddings, but each batch is handed out while the cursor
+        is still being read, so memory is bounded by batch_size rather than limit.
+        
+        Args:
+            limit: Maximum number of candidates to yield in total
+            batch_size: Candidates per yielded batch
+            
+        Yields:
+            Lists of up to batch_size candidate documents, limited to CANDIDATE_EMBEDDING_PROJECTION
+        """
+        batch: List[Dict] = []
+        async for doc in self._pending_cursor(limit):
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _pending_cursor(self, limit: int):
+        # Both branches are served by the embedding_status index from ensure_indexes.
+        # create_profile always writes a status, but profiles inserted by other services may
+        # not; the second branch catches those as long as they have no vector.
         query = {
             "$or": [
-                {"embedding_status": {"$in": ["pending", "stale", "error"]}},
-                {"embedding_vector": {"$exists": False}},
-                {"embedding_vector": None},
+                {"embedding_status": {"$in": PENDING_EMBEDDING_STATUSES}},
+                {"embedding_status": None, "embedding_vector": None},
             ]
         }
-        
-        cursor = self._collection.find(query).limit(limit)
-        candidates = await cursor.to_list(length=limit)
-        
-        logger.info(f"Found {len(candidates)} candidates needing embeddings (limit: {limit})")
-        return candidates
+        return self._collection.find(query, CANDIDATE_EMBEDDING_PROJECTION).limit(limit)
 
     def _touches_embedding_fields(self, updates: Dict) -> bool:
         """
@@ -240,16 +413,33 @@ class UserProfileService:
         """
         await self._collection.update_one(
             {"_id": candidate_id},
-            {
-                "$set": {
-                    "embedding_vector": result.vector,
-                    "embedding_model": result.model,
-                    "embedding_dimensions": self._settings.EMBEDDING_VECTOR_SIZE,
-                    "embedding_status": "ready",
-                    "embedding_last_generated_at": result.generated_at,
-                    "embedding_error": None,
-                    "embedding_version": result.model,
-                }
-            },
+            {"$set": self._embedding_fields(result)},
         )
-        logger.debug(f"Persisted embedding for candidate {candidate_id}")
+        logger.debug("Persisted embedding for candidate %s", candidate_id)
+
+    def _embedding_fields(self, result: EmbeddingResult) -> Dict[str, Any]:
+        """
+        Build the $set fields that store an embedding result on a candidate.
+        
+        Args:
+            result: Embedding result from embedding service
+            
+        Returns:
+            Fields for the candidate's "ready" embedding state
+        """
+        # int8 copy with a per-vector scale for the manual applied ranker: a quarter of float32
+        # on the wire and no per-element BSON double decode
+        quantized, scale = quantize_int8(result.vector)
+        return {
+            # BSON float32 vector: Atlas $vectorSearch indexes it directly, it is half the
+            # size of an array of doubles, and reads decode it with one np.frombuffer
+            "embedding_vector": to_bson_vector(result.vector),
+            "embedding_int8": Binary(quantized),
+            "embedding_scale": scale,
+            "embedding_model": result.model,
+            "embedding_dimensions": self._settings.EMBEDDING_VECTOR_SIZE,
+            "embedding_status": "ready",
+            "embedding_last_generated_at": result.generated_at,
+            "embedding_error": None,
+            "embedding_version": result.model,
+        }
@@ -0,0 +1,87 @@
+"""
+In-process caching helpers.
+Small bounded caches for values that are expensive to fetch or compute per request.
+"""
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """Bounded mapping that evicts the least recently used entry once full."""
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive.")
+        self._maxsize = maxsize
+        self._data: "OrderedDict[K, V]" = OrderedDict()
+
+    def get(self, key: K) -> Optional[V]:
+        """
+        Return the cached value and mark it as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None when absent
+        """
+        try:
+            self._data.move_to_end(key)
+        except KeyError:
+            return None
+        return self._data[key]
+
+    def put(self, key: K, value: V) -> None:
+        """Insert or replace a value, evicting the oldest entry when over capacity."""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TTLCache(Generic[K, V]):
+    """LRU cache whose entries also expire a fixed number of seconds after insertion."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0) -> None:
+        if ttl <= 0:
+            raise ValueError("ttl must be positive.")
+        self._ttl = ttl
+        self._entries: LRUCache[K, Tuple[float, V]] = LRUCache(maxsize)
+
+    def get(self, key: K) -> Optional[V]:
+        """
+        Return the cached value if it has not expired yet.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None when absent or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            return None
+        return value
+
+    def put(self, key: K, value: V) -> None:
+        """Insert or replace a value; it expires ttl seconds from now."""
+        self._entries.put(key, (time.monotonic() + self._ttl, value))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,28 @@
+"""
+Datetime helpers.
+All timestamps written by the app are tz-aware UTC; documents may still hold naive UTC values.
+"""
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def utcnow() -> datetime:
+    """Current time as a tz-aware UTC datetime."""
+    return datetime.now(timezone.utc)
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Normalize a datetime for comparison.
+    
+    Args:
+        value: Naive (assumed UTC, as PyMongo returns by default) or tz-aware datetime
+        
+    Returns:
+        tz-aware UTC datetime, or None when value is None
+    """
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
@@ -1,6 +1,9 @@
 """
 Structured logging utility for the candidate recommendation system.
 Provides consistent logging across all services with proper formatting.
+
+Convention: pass values as arguments, e.g. logger.info("Found %s jobs", count),
+never pre-formatted f-strings, so interpolation is skipped when the level is disabled.
 """
 import logging
 import sys
@@ -0,0 +1,74 @@
+"""
+Embedding vector helpers.
+Converts between Python lists, numpy arrays and the packed bytes stored in MongoDB.
+"""
+from typing import Sequence, Tuple, Union
+
+import numpy as np
+from bson.binary import VECTOR_SUBTYPE, Binary, BinaryVectorDtype
+
+VectorLike = Union[Sequence[float], np.ndarray, bytes]
+
+
+def as_float32(vector: VectorLike) -> np.ndarray:
+    """
+    Return the vector as a 1-D float32 numpy array.
+    
+    Args:
+        vector: List of floats, numpy array, BSON float32 vector, or packed little-endian float32 bytes
+        
+    Returns:
+        float32 array (a zero-copy view when given bytes)
+    """
+    if isinstance(vector, Binary) and vector.subtype == VECTOR_SUBTYPE:
+        # BSON vector layout: dtype byte, padding byte, then the packed little-endian elements
+        if vector[:1] != BinaryVectorDtype.FLOAT32.value:
+            raise ValueError("Expected a float32 BSON vector.")
+        return np.frombuffer(vector, dtype="<f4", offset=2)
+    if isinstance(vector, (bytes, bytearray, memoryview)):
+        return np.frombuffer(vector, dtype=np.float32)
+    return np.asarray(vector, dtype=np.float32)
+
+
+def to_bson_vector(vector: VectorLike) -> Binary:
+    """Pack a vector as a BSON float32 vector (BinData subtype 9), which Atlas Vector Search indexes."""
+    return Binary.from_vector(as_float32(vector), BinaryVectorDtype.FLOAT32)
+
+
+def l2_normalize(vector: VectorLike) -> np.ndarray:
+    """
+    Scale a vector to unit length so cosine similarity reduces to a dot product.
+    
+    Args:
+        vector: Vector to normalize
+        
+    Returns:
+        New float32 array with L2 norm 1 (unchanged if the input is all zeros)
+    """
+    array = np.array(as_float32(vector), dtype=np.float32)
+    norm = float(np.linalg.norm(array))
+    if norm > 0:
+        array /= norm
+    return array
+
+
+def quantize_int8(vector: VectorLike) -> Tuple[bytes, float]:
+    """
+    Symmetric per-vector int8 quantization.
+    
+    Args:
+        vector: Vector to quantize
+        
+    Returns:
+        Tuple of (packed int8 bytes, scale) where value ~= int8 * scale
+    """
+    array = as_float32(vector)
+    peak = float(np.max(np.abs(array))) if array.size else 0.0
+    scale = peak / 127.0 if peak > 0 else 1.0
+    quantized = np.clip(np.rint(array / scale), -127, 127).astype(np.int8)
+    return quantized.tobytes(), scale
+
+
+def dequantize_int8(data: bytes, scale: float) -> np.ndarray:
+    """Restore a float32 vector from packed int8 bytes and its scale."""
+    return np.frombuffer(data, dtype=np.int8).astype(np.float32) * np.float32(scale)
@@ -10,10 +10,10 @@ from pathlib import Path
 # Add parent directory to path to import app modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import AsyncMongoClient
 
 from app.config.settings import Settings
-from app.services.embedding_service import EmbeddingService
+from app.services.embedding_service import EmbeddingService, close_azure_client
 from app.services.user_profile_service import UserProfileService
 from app.utils.logger import setup_logger
 
@@ -24,6 +24,7 @@ async def backfill_candidate_embeddings(
     *,
     limit: int = 100,
     batch_size: int = 10,
+    concurrency: int = 4,
     dry_run: bool = False,
 ):
     """
@@ -32,19 +33,21 @@ async def backfill_candidate_embeddings(
     Args:
         limit: Maximum number of candidates to process
         batch_size: Number of candidates to process in each batch
+        concurrency: Maximum number of batches being embedded at once
         dry_run: If True, only show what would be processed without making changes
     """
     logger.info("=" * 60)
     logger.info("Candidate Embeddings Backfill Script")
     logger.info("=" * 60)
-    logger.info(f"Limit: {limit}")
-    logger.info(f"Batch size: {batch_size}")
-    logger.info(f"Dry run: {dry_run}")
+    logger.info("Limit: %s", limit)
+    logger.info("Batch size: %s", batch_size)
+    logger.info("Concurrency: %s", concurrency)
+    logger.info("Dry run: %s", dry_run)
     logger.info("=" * 60)
     
     # Initialize settings and services
     settings = Settings()
-    client = AsyncIOMotorClient(settings.MONGO_URI)
+    client = AsyncMongoClient(settings.MONGO_URI)
     db = client[settings.DATABASE_NAME]
     userprofiles_collection = db[settings.USER_PROFILES_COLLECTION]
     
@@ -55,67 +58,101 @@ async def backfill_candidate_embeddings(
         settings=settings,
     )
     
+    in_flight = set()
     try:
-        # Find candidates needing embeddings
-        logger.info("Finding candidates needing embeddings...")
-        candidates = await profile_service.list_pending_embeddings(limit=limit)
-        
-        if not candidates:
-            logger.info("✓ No candidates need embeddings. All done!")
-            return
-        
-        logger.info(f"Found {len(candidates)} candidates needing embeddings")
+        # Make sure the pending index exists and candidates that lost their vector are flagged;
+        # a dry run makes no changes, so it only sees candidates that are already pending or
+        # have no status
+        if not dry_run:
+            await profile_service.ensure_indexes()
+            await profile_service.mark_missing_embeddings()
         
+        # Stream candidates needing embeddings; each batch is processed as soon as it is read,
+        # so only batch_size documents are held at a time
+        logger.info("Finding candidates needing embeddings...")
         if dry_run:
             logger.info("\n--- DRY RUN MODE - No changes will be made ---")
-            for i, candidate in enumerate(candidates, 1):
-                candidate_id = str(candidate["_id"])
-                personal = candidate.get("personal_information", {})
-                name = f"{personal.get('first_name', '')} {personal.get('last_name', '')}".strip() or "N/A"
-                status = candidate.get("embedding_status", "missing")
-                logger.info(f"{i}. Candidate {candidate_id}: {name} (status: {status})")
-            logger.info("--- End of dry run ---\n")
-            return
         
-        # Process candidates in batches
         total_processed = 0
         total_success = 0
         total_failed = 0
+        batch_num = 0
         
-        for i in range(0, len(candidates), batch_size):
-            batch = candidates[i:i + batch_size]
-            batch_num = (i // batch_size) + 1
-            logger.info(f"\nProcessing batch {batch_num} ({len(batch)} candidates)...")
-            
-            for candidate in batch:
+        async def _refresh(number, batch):
+            logger.info("\nProcessing batch %s (%s candidates)...", number, len(batch))
+            # One embeddings request and one bulk write for the whole batch; a failure is
+            # returned per candidate, not raised
+            return number, batch, await profile_service.refresh_embeddings_for_docs(batch)
+        
+        def _report(task):
+            nonlocal total_processed, total_success, total_failed
+            number, batch, outcomes = task.result()
+            for candidate, outcome in zip(batch, outcomes):
                 candidate_id = str(candidate["_id"])
                 personal = candidate.get("personal_information", {})
-                name = f"{personal.get('first_name', '')} {personal.get('last_name', '')}".strip() or "N/A"
+                name = personal.get("full_name") or f"{personal.get('first_name', '')} {personal.get('last_name', '')}".strip() or "N/A"
                 
-                try:
-                    logger.info(f"  Processing candidate {candidate_id}: {name}")
-                    await profile_service.refresh_embedding(candidate_id)
-                    total_success += 1
-                    logger.info(f"  ✓ Successfully generated embedding for candidate {candidate_id}")
-                except Exception as exc:
+                if outcome is not None:
                     total_failed += 1
-                    logger.error(f"  ✗ Failed to generate embedding for candidate {candidate_id}: {exc}")
+                    logger.error("  ✗ Failed to generate embedding for candidate %s (%s): %s", candidate_id, name, outcome)
+                else:
+                    total_success += 1
+                    logger.info("  ✓ Successfully generated embedding for candidate %s: %s", candidate_id, name)
                 
                 total_processed += 1
             
-            logger.info(f"Batch {batch_num} complete. Progress: {total_processed}/{len(candidates)}")
+            logger.info("Batch %s complete. Progress: %s candidates processed", number, total_processed)
+        
+        async for batch in profile_service.iter_pending_embeddings(limit=limit, batch_size=batch_size):
+            batch_num += 1
+            
+            if dry_run:
+                for candidate in batch:
+                    total_processed += 1
+                    candidate_id = str(candidate["_id"])
+                    personal = candidate.get("personal_information", {})
+                    name = personal.get("full_name") or f"{personal.get('first_name', '')} {personal.get('last_name', '')}".strip() or "N/A"
+                    status = candidate.get("embedding_status", "missing")
+                    logger.info("%s. Candidate %s: %s (status: %s)", total_processed, candidate_id, name, status)
+                continue
+            
+            # Refresh in the background so the cursor pages in the next batch meanwhile;
+            # once concurrency batches are running, wait for one to finish before reading on
+            in_flight.add(asyncio.create_task(_refresh(batch_num, batch)))
+            if len(in_flight) >= concurrency:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    _report(task)
+        
+        if in_flight:
+            done, in_flight = await asyncio.wait(in_flight)
+            for task in done:
+                _report(task)
+        
+        if not total_processed:
+            logger.info("✓ No candidates need embeddings. All done!")
+            return
+        
+        if dry_run:
+            logger.info("--- End of dry run (%s candidates) ---\n", total_processed)
+            return
         
         # Summary
         logger.info("\n" + "=" * 60)
         logger.info("BACKFILL COMPLETE")
         logger.info("=" * 60)
-        logger.info(f"Total processed: {total_processed}")
-        logger.info(f"Successful: {total_success}")
-        logger.info(f"Failed: {total_failed}")
+        logger.info("Total processed: %s", total_processed)
+        logger.info("Successful: %s", total_success)
+        logger.info("Failed: %s", total_failed)
         logger.info("=" * 60)
         
     finally:
-        client.close()
+        # Batches still running after an error would write through a closed client
+        for task in in_flight:
+            task.cancel()
+        # Release the shared Azure OpenAI HTTP/2 pool before the event loop goes away
+        await close_azure_client()
+        await client.close()
         logger.info("Database connection closed")
 
 
@@ -136,6 +173,12 @@ def main():
         default=10,
         help="Number of candidates to process in each batch (default: 10)",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Maximum number of batches embedded at once (default: 4)",
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -148,6 +191,7 @@ def main():
         backfill_candidate_embeddings(
             limit=args.limit,
             batch_size=args.batch_size,
+            concurrency=max(1, args.concurrency),
             dry_run=args.dry_run,
         )
     )
@@ -0,0 +1,106 @@
+"""
+One-off migration that stores personal_information.full_name on existing candidate profiles.
+Search hits read the stored name and only join first/last name when it is missing; profile
+writes now recompute it from first/last name, so this brings older rows in line, overwriting
+any stored name that no longer matches.
+"""
+import asyncio
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pymongo import AsyncMongoClient
+
+from app.config.settings import Settings
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__, level="INFO")
+
+
+def _trimmed(field: str) -> dict:
+    return {"$trim": {"input": {"$ifNull": [field, ""]}}}
+
+
+# "first last", built the same way profile writes build it
+FULL_NAME_EXPR = {
+    "$trim": {
+        "input": {
+            "$concat": [
+                _trimmed("$personal_information.first_name"),
+                " ",
+                _trimmed("$personal_information.last_name"),
+            ]
+        }
+    }
+}
+
+# Profiles with name parts whose stored full name is missing or stale
+STALE_FULL_NAME = {
+    "$or": [
+        {"personal_information.first_name": {"$nin": [None, ""]}},
+        {"personal_information.last_name": {"$nin": [None, ""]}},
+    ],
+    "$expr": {"$ne": ["$personal_information.full_name", FULL_NAME_EXPR]},
+}
+
+
+async def backfill_candidate_full_names(*, dry_run: bool = False):
+    """
+    Set personal_information.full_name to "first last" wherever it is missing or stale.
+
+    The update runs server-side as a single pipeline update_many.
+
+    Args:
+        dry_run: If True, only count profiles that would be updated
+    """
+    logger.info("=" * 60)
+    logger.info("Candidate Full Name Backfill")
+    logger.info("=" * 60)
+    logger.info("Dry run: %s", dry_run)
+    logger.info("=" * 60)
+
+    settings = Settings()
+    client = AsyncMongoClient(settings.MONGO_URI)
+    collection = client[settings.DATABASE_NAME][settings.USER_PROFILES_COLLECTION]
+
+    try:
+        if dry_run:
+            pending = await collection.count_documents(STALE_FULL_NAME)
+            logger.info("Would update: %s", pending)
+            return
+
+        result = await collection.update_many(
+            STALE_FULL_NAME,
+            [{"$set": {"personal_information.full_name": FULL_NAME_EXPR}}],
+        )
+
+        logger.info("=" * 60)
+        logger.info("FULL NAME BACKFILL COMPLETE")
+        logger.info("Updated: %s", result.modified_count)
+        logger.info("=" * 60)
+    finally:
+        await client.close()
+        logger.info("Database connection closed")
+
+
+def main():
+    """Parse arguments and run the migration."""
+    parser = argparse.ArgumentParser(
+        description="Store full names on existing candidate profiles"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Count profiles with a missing or stale full name without making changes",
+    )
+
+    args = parser.parse_args()
+
+    asyncio.run(backfill_candidate_full_names(dry_run=args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -10,10 +10,10 @@ from pathlib import Path
 # Add parent directory to path to import app modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import AsyncMongoClient
 
 from app.config.settings import Settings
-from app.services.embedding_service import EmbeddingService
+from app.services.embedding_service import EmbeddingService, close_azure_client
 from app.services.job_listing_service import JobListingService
 from app.utils.logger import setup_logger
 
@@ -24,6 +24,7 @@ async def backfill_job_embeddings(
     *,
     limit: int = 100,
     batch_size: int = 10,
+    concurrency: int = 4,
     dry_run: bool = False,
 ):
     """
@@ -32,19 +33,21 @@ async def backfill_job_embeddings(
     Args:
         limit: Maximum number of jobs to process
         batch_size: Number of jobs to process in each batch
+        concurrency: Maximum number of batches being embedded at once
         dry_run: If True, only show what would be processed without making changes
     """
     logger.info("=" * 60)
     logger.info("Job Embeddings Backfill Script")
     logger.info("=" * 60)
-    logger.info(f"Limit: {limit}")
-    logger.info(f"Batch size: {batch_size}")
-    logger.info(f"Dry run: {dry_run}")
+    logger.info("Limit: %s", limit)
+    logger.info("Batch size: %s", batch_size)
+    logger.info("Concurrency: %s", concurrency)
+    logger.info("Dry run: %s", dry_run)
     logger.info("=" * 60)
     
     # Initialize settings and services
     settings = Settings()
-    client = AsyncIOMotorClient(settings.MONGO_URI)
+    client = AsyncMongoClient(settings.MONGO_URI)
     db = client[settings.DATABASE_NAME]
     job_collection = db[settings.JOB_COLLECTION]
     
@@ -55,65 +58,94 @@ async def backfill_job_embeddings(
         settings=settings,
     )
     
+    in_flight = set()
     try:
-        # Find jobs needing embeddings
-        logger.info("Finding jobs needing embeddings...")
-        jobs = await job_service.list_pending_embeddings(limit=limit)
-        
-        if not jobs:
-            logger.info("✓ No jobs need embeddings. All done!")
-            return
-        
-        logger.info(f"Found {len(jobs)} jobs needing embeddings")
+        # Make sure the pending index exists and jobs that lost their vector are flagged; a dry
+        # run makes no changes, so it only sees jobs that are already pending or have no status
+        if not dry_run:
+            await job_service.ensure_indexes()
+            await job_service.mark_missing_embeddings()
         
+        # Stream jobs needing embeddings; each batch is processed as soon as it is read,
+        # so only batch_size documents are held at a time
+        logger.info("Finding jobs needing embeddings...")
         if dry_run:
             logger.info("\n--- DRY RUN MODE - No changes will be made ---")
-            for i, job in enumerate(jobs, 1):
-                job_id = str(job["_id"])
-                title = job.get("title", "N/A")
-                status = job.get("job_embedding_status", "missing")
-                logger.info(f"{i}. Job {job_id}: {title} (status: {status})")
-            logger.info("--- End of dry run ---\n")
-            return
         
-        # Process jobs in batches
         total_processed = 0
         total_success = 0
         total_failed = 0
+        batch_num = 0
+        
+        async def _refresh(number, batch):
+            logger.info("\nProcessing batch %s (%s jobs)...", number, len(batch))
+            # One embeddings request and one bulk write for the whole batch; a job that
+            # fails is marked "error" by the service on its own instead of raising
+            return number, batch, await job_service.refresh_many(batch, batch_size=len(batch))
+        
+        def _report(task):
+            nonlocal total_processed, total_success, total_failed
+            number, batch, refreshed = task.result()
+            total_success += refreshed
+            total_failed += len(batch) - refreshed
+            total_processed += len(batch)
+            
+            if refreshed == len(batch):
+                logger.info("  ✓ Successfully generated embeddings for %s jobs", refreshed)
+            else:
+                logger.error("  ✗ Failed to generate embeddings for %s jobs in batch %s", len(batch) - refreshed, number)
+            
+            logger.info("Batch %s complete. Progress: %s jobs processed", number, total_processed)
         
-        for i in range(0, len(jobs), batch_size):
-            batch = jobs[i:i + batch_size]
-            batch_num = (i // batch_size) + 1
-            logger.info(f"\nProcessing batch {batch_num} ({len(batch)} jobs)...")
+        async for batch in job_service.iter_pending_embeddings(limit=limit, batch_size=batch_size):
+            batch_num += 1
             
-            for job in batch:
-                job_id = str(job["_id"])
-                title = job.get("title", "N/A")
-                
-                try:
-                    logger.info(f"  Processing job {job_id}: {title}")
-                    await job_service.refresh_embedding(job_id)
-                    total_success += 1
-                    logger.info(f"  ✓ Successfully generated embedding for job {job_id}")
-                except Exception as exc:
-                    total_failed += 1
-                    logger.error(f"  ✗ Failed to generate embedding for job {job_id}: {exc}")
-                
-                total_processed += 1
+            if dry_run:
+                for job in batch:
+                    total_processed += 1
+                    job_id = str(job["_id"])
+                    title = job.get("title", "N/A")
+                    status = job.get("job_embedding_status", "missing")
+                    logger.info("%s. Job %s: %s (status: %s)", total_processed, job_id, title, status)
+                continue
             
-            logger.info(f"Batch {batch_num} complete. Progress: {total_processed}/{len(jobs)}")
+            # Refresh in the background so the cursor pages in the next batch meanwhile;
+            # once concurrency batches are running, wait for one to finish before reading on
+            in_flight.add(asyncio.create_task(_refresh(batch_num, batch)))
+            if len(in_flight) >= concurrency:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    _report(task)
+        
+        if in_flight:
+            done, in_flight = await asyncio.wait(in_flight)
+            for task in done:
+                _report(task)
+        
+        if not total_processed:
+            logger.info("✓ No jobs need embeddings. All done!")
+            return
+        
+        if dry_run:
+            logger.info("--- End of dry run (%s jobs) ---\n", total_processed)
+            return
         
         # Summary
         logger.info("\n" + "=" * 60)
         logger.info("BACKFILL COMPLETE")
         logger.info("=" * 60)
-        logger.info(f"Total processed: {total_processed}")
-        logger.info(f"Successful: {total_success}")
-        logger.info(f"Failed: {total_failed}")
+        logger.info("Total processed: %s", total_processed)
+        logger.info("Successful: %s", total_success)
+        logger.info("Failed: %s", total_failed)
         logger.info("=" * 60)
         
     finally:
-        client.close()
+        # Batches still running after an error would write through a closed client
+        for task in in_flight:
+            task.cancel()
+        # Release the shared Azure OpenAI HTTP/2 pool before the event loop goes away
+        await close_azure_client()
+        await client.close()
         logger.info("Database connection closed")
 
 
@@ -134,6 +166,12 @@ def main():
         default=10,
         help="Number of jobs to process in each batch (default: 10)",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Maximum number of batches embedded at once (default: 4)",
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -146,6 +184,7 @@ def main():
         backfill_job_embeddings(
             limit=args.limit,
             batch_size=args.batch_size,
+            concurrency=max(1, args.concurrency),
             dry_run=args.dry_run,
         )
     )
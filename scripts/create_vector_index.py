@@ -3,13 +3,14 @@ Script to programmatically create MongoDB Atlas Vector Search index.
 This creates the required index for semantic candidate search.
 """
 import asyncio
+import json
 import sys
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import AsyncMongoClient
 from pymongo.errors import OperationFailure
 
 from app.config.settings import Settings
@@ -18,6 +19,30 @@ from app.utils.logger import setup_logger
 logger = setup_logger(__name__, level="INFO")
 
 
+def build_index_definition(settings: Settings) -> dict:
+    """Return the vectorSearch definition the search service expects."""
+    return {
+        "fields": [
+            {
+                "type": "vector",
+                # BSON float32 vectors (BinData subtype 9); legacy arrays of doubles index too
+                "path": "embedding_vector",
+                "numDimensions": settings.EMBEDDING_VECTOR_SIZE,
+                # Embeddings are stored unit length, so dotProduct ranks exactly like cosine
+                "similarity": "dotProduct"
+            }
+        ]
+    }
+
+
+def _same_fields(existing: dict, desired: dict) -> bool:
+    """Compare two definitions field by field, ignoring field order."""
+    def key(field: dict) -> str:
+        return json.dumps(field, sort_keys=True)
+
+    return sorted(map(key, (existing or {}).get("fields", []))) == sorted(map(key, desired["fields"]))
+
+
 async def create_vector_search_index():
     """
     Create Atlas Vector Search index for userprofiles collection.
@@ -30,82 +55,73 @@ async def create_vector_search_index():
     
     # Initialize settings and connection
     settings = Settings()
-    client = AsyncIOMotorClient(settings.MONGO_URI)
+    client = AsyncMongoClient(settings.MONGO_URI)
     db = client[settings.DATABASE_NAME]
     collection = db[settings.USER_PROFILES_COLLECTION]
     
     index_name = settings.USERPROFILE_VECTOR_INDEX
+    definition = build_index_definition(settings)
     
     try:
         # Check if index already exists
-        logger.info(f"Checking for existing index: {index_name}")
+        logger.info("Checking for existing index: %s", index_name)
         
         try:
-            # List existing search indexes
-            existing_indexes = await collection.list_search_indexes().to_list(length=None)
+            # $listSearchIndexes filtered by name on the server; at most one match
+            matches = await (await collection.list_search_indexes(index_name)).to_list(length=1)
             
-            for idx in existing_indexes:
-                if idx.get("name") == index_name:
-                    logger.info(f"✓ Index '{index_name}' already exists!")
-                    logger.info(f"  Status: {idx.get('status', 'unknown')}")
-                    logger.info(f"  Type: {idx.get('type', 'unknown')}")
-                    
-                    if idx.get("status") == "READY":
-                        logger.info("\n✓ Index is READY and can be used for searches.")
-                        return
-                    else:
-                        logger.info(f"\n⚠ Index exists but status is: {idx.get('status')}")
-                        logger.info("  Please wait for it to become READY.")
-                        return
-        except AttributeError:
-            # list_search_indexes might not be available in older motor versions
-            logger.warning("Unable to list search indexes (motor version may not support it)")
+            if matches:
+                idx = matches[0]
+                logger.info("✓ Index '%s' already exists!", index_name)
+                logger.info("  Status: %s", idx.get('status', 'unknown'))
+                logger.info("  Type: %s", idx.get('type', 'unknown'))
+                
+                # Existing deployments keep their old definition unless it is updated in place
+                if not _same_fields(idx.get("latestDefinition"), definition):
+                    logger.info("  Definition differs from the expected one; updating it")
+                    await collection.update_search_index(index_name, definition)
+                    logger.info("\n⏳ Index update initiated; it is rebuilt in the background.")
+                    logger.info("   Searches keep using the old definition until the rebuild is READY.")
+                elif idx.get("status") == "READY":
+                    logger.info("\n✓ Index is READY and can be used for searches.")
+                else:
+                    logger.info("\n⚠ Index exists but status is: %s", idx.get('status'))
+                    logger.info("  Please wait for it to become READY.")
+                return
+        except OperationFailure as exc:
+            # $listSearchIndexes is only served by Atlas; creation below reports the details
+            logger.warning("Unable to list search indexes: %s", exc)
         
         # Create the vector search index
-        logger.info(f"\nCreating vector search index: {index_name}")
-        
-        index_definition = {
-            "name": index_name,
-            "type": "vectorSearch",
-            "definition": {
-                "fields": [
-                    {
-                        "type": "vector",
-                        "path": "embedding_vector",
-                        "numDimensions": settings.EMBEDDING_VECTOR_SIZE,
-                        "similarity": "cosine"
-                    }
-                ]
-            }
-        }
+        logger.info("\nCreating vector search index: %s", index_name)
         
-        logger.info(f"Index definition:")
-        logger.info(f"  Collection: {settings.USER_PROFILES_COLLECTION}")
-        logger.info(f"  Index name: {index_name}")
-        logger.info(f"  Vector field: embedding_vector")
-        logger.info(f"  Dimensions: {settings.EMBEDDING_VECTOR_SIZE}")
-        logger.info(f"  Similarity: cosine")
+        logger.info("Index definition:")
+        logger.info("  Collection: %s", settings.USER_PROFILES_COLLECTION)
+        logger.info("  Index name: %s", index_name)
+        logger.info("  Vector field: embedding_vector")
+        logger.info("  Dimensions: %s", settings.EMBEDDING_VECTOR_SIZE)
+        logger.info("  Similarity: dotProduct")
         
         # Create the index using createSearchIndex command
         try:
             result = await db.command({
                 "createSearchIndexes": settings.USER_PROFILES_COLLECTION,
-                "indexes": [index_definition]
+                "indexes": [{"name": index_name, "type": "vectorSearch", "definition": definition}]
             })
             
             logger.info("\n✓ Vector search index creation initiated!")
-            logger.info(f"  Result: {result}")
+            logger.info("  Result: %s", result)
             logger.info("\n⏳ The index is now building. This may take 2-5 minutes.")
             logger.info("   You can check the status in MongoDB Atlas UI or run this script again.")
             
         except OperationFailure as e:
             if "already exists" in str(e).lower():
-                logger.info(f"\n✓ Index '{index_name}' already exists!")
+                logger.info("\n✓ Index '%s' already exists!", index_name)
             else:
                 raise
         
     except OperationFailure as exc:
-        logger.error(f"\n✗ Failed to create vector search index: {exc}")
+        logger.error("\n✗ Failed to create vector search index: %s", exc)
         logger.error("\nPossible reasons:")
         logger.error("1. Your MongoDB cluster doesn't support Atlas Search (requires M10+ tier)")
         logger.error("2. You don't have permissions to create search indexes")
@@ -113,49 +129,47 @@ async def create_vector_search_index():
         logger.error("\nIf you're using MongoDB Atlas, you may need to create the index via the UI.")
         raise
     except Exception as exc:
-        logger.error(f"\n✗ Unexpected error: {exc}", exc_info=True)
+        logger.error("\n✗ Unexpected error: %s", exc, exc_info=True)
         raise
     finally:
-        client.close()
+        await client.close()
         logger.info("\n" + "=" * 60)
 
 
 async def check_index_status():
     """Check the status of the vector search index."""
     settings = Settings()
-    client = AsyncIOMotorClient(settings.MONGO_URI)
+    client = AsyncMongoClient(settings.MONGO_URI)
     db = client[settings.DATABASE_NAME]
     collection = db[settings.USER_PROFILES_COLLECTION]
     
     index_name = settings.USERPROFILE_VECTOR_INDEX
     
     try:
-        logger.info(f"\nChecking status of index: {index_name}")
+        logger.info("\nChecking status of index: %s", index_name)
         
         try:
-            existing_indexes = await collection.list_search_indexes().to_list(length=None)
+            # $listSearchIndexes filtered by name on the server; at most one match
+            matches = await (await collection.list_search_indexes(index_name)).to_list(length=1)
             
-            found = False
-            for idx in existing_indexes:
-                if idx.get("name") == index_name:
-                    found = True
-                    logger.info(f"\n✓ Found index: {index_name}")
-                    logger.info(f"  Status: {idx.get('status', 'unknown')}")
-                    logger.info(f"  Type: {idx.get('type', 'unknown')}")
-                    
-                    if idx.get("status") == "READY":
-                        logger.info("\n✓ Index is READY! You can now use the search endpoints.")
-                    else:
-                        logger.info(f"\n⏳ Index is still building. Current status: {idx.get('status')}")
-                        logger.info("   Please wait a few more minutes and check again.")
-            
-            if not found:
-                logger.info(f"\n✗ Index '{index_name}' not found.")
+            if matches:
+                idx = matches[0]
+                logger.info("\n✓ Found index: %s", index_name)
+                logger.info("  Status: %s", idx.get('status', 'unknown'))
+                logger.info("  Type: %s", idx.get('type', 'unknown'))
+                
+                if idx.get("status") == "READY":
+                    logger.info("\n✓ Index is READY! You can now use the search endpoints.")
+                else:
+                    logger.info("\n⏳ Index is still building. Current status: %s", idx.get('status'))
+                    logger.info("   Please wait a few more minutes and check again.")
+            else:
+                logger.info("\n✗ Index '%s' not found.", index_name)
                 logger.info("   Run this script to create it.")
-        except AttributeError:
-            logger.warning("Unable to check index status (motor version may not support it)")
+        except OperationFailure as exc:
+            logger.warning("Unable to check index status: %s", exc)
     finally:
-        client.close()
+        await client.close()
 
 
 def main():
@@ -0,0 +1,145 @@
+"""
+One-off migration that rescales stored candidate embeddings to unit length.
+Required before switching the userprofiles vector index to dotProduct similarity,
+which only ranks like cosine when every stored vector has norm 1. Legacy arrays of
+doubles are rewritten as BSON float32 vectors (BinData subtype 9) on the way, and the
+int8 copy used by the applied ranker is re-quantized from the unit vector.
+"""
+import asyncio
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from bson.binary import VECTOR_SUBTYPE, Binary
+from pymongo import AsyncMongoClient, UpdateOne
+
+from app.config.settings import Settings
+from app.utils.logger import setup_logger
+from app.utils.vectors import as_float32, dequantize_int8, l2_normalize, quantize_int8, to_bson_vector
+
+logger = setup_logger(__name__, level="INFO")
+
+# Vectors already within this distance of unit length are left untouched
+NORM_TOLERANCE = 1e-3
+# int8 rounding moves the norm slightly, so the stored copy gets a looser bound
+INT8_NORM_TOLERANCE = 1e-2
+
+
+async def normalize_candidate_embeddings(
+    *,
+    batch_size: int = 500,
+    dry_run: bool = False,
+):
+    """
+    Rewrite every candidate embedding_vector as vec / ||vec||, stored as a BSON float32 vector,
+    together with an int8 copy quantized from the unit vector.
+
+    Args:
+        batch_size: Number of updates sent per bulk_write
+        dry_run: If True, only count vectors that would be rewritten
+    """
+    logger.info("=" * 60)
+    logger.info("Candidate Embedding Normalization")
+    logger.info("=" * 60)
+    logger.info("Batch size: %s", batch_size)
+    logger.info("Dry run: %s", dry_run)
+    logger.info("=" * 60)
+
+    settings = Settings()
+    client = AsyncMongoClient(settings.MONGO_URI)
+    collection = client[settings.DATABASE_NAME][settings.USER_PROFILES_COLLECTION]
+
+    scanned = 0
+    rewritten = 0
+    pending: list[UpdateOne] = []
+
+    try:
+        cursor = collection.find(
+            {"embedding_vector": {"$exists": True, "$ne": []}},
+            {"embedding_vector": 1, "embedding_int8": 1, "embedding_scale": 1},
+        )
+        async for doc in cursor:
+            vector = doc.get("embedding_vector")
+            if not vector:
+                continue
+            scanned += 1
+            is_bson_vector = isinstance(vector, Binary) and vector.subtype == VECTOR_SUBTYPE
+            norm = float(np.linalg.norm(as_float32(vector)))
+            vector_ok = is_bson_vector and (norm == 0 or abs(norm - 1.0) <= NORM_TOLERANCE)
+            # An int8 copy quantized before normalization would keep ranking on the old scale
+            int8_ok = True
+            if doc.get("embedding_int8") and doc.get("embedding_scale"):
+                int8_norm = float(np.linalg.norm(dequantize_int8(doc["embedding_int8"], doc["embedding_scale"])))
+                int8_ok = norm == 0 or abs(int8_norm - 1.0) <= INT8_NORM_TOLERANCE
+            if vector_ok and int8_ok:
+                continue
+
+            rewritten += 1
+            if dry_run:
+                continue
+
+            unit = l2_normalize(vector)
+            quantized, scale = quantize_int8(unit)
+            pending.append(
+                UpdateOne(
+                    {"_id": doc["_id"]},
+                    {
+                        "$set": {
+                            "embedding_vector": to_bson_vector(unit),
+                            "embedding_int8": Binary(quantized),
+                            "embedding_scale": scale,
+                        }
+                    },
+                )
+            )
+            if len(pending) >= batch_size:
+                await collection.bulk_write(pending, ordered=False)
+                pending = []
+                logger.info("Progress: %s rewritten / %s scanned", rewritten, scanned)
+
+        if pending:
+            await collection.bulk_write(pending, ordered=False)
+
+        logger.info("=" * 60)
+        logger.info("NORMALIZATION COMPLETE" if not dry_run else "DRY RUN COMPLETE")
+        logger.info("Scanned: %s", scanned)
+        logger.info("%s: %s", 'Would rewrite' if dry_run else 'Rewritten', rewritten)
+        logger.info("=" * 60)
+    finally:
+        await client.close()
+        logger.info("Database connection closed")
+
+
+def main():
+    """Parse arguments and run the migration."""
+    parser = argparse.ArgumentParser(
+        description="Normalize stored candidate embeddings to unit length"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Number of updates per bulk write (default: 500)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Count vectors that need rewriting without making changes",
+    )
+
+    args = parser.parse_args()
+
+    asyncio.run(
+        normalize_candidate_embeddings(
+            batch_size=args.batch_size,
+            dry_run=args.dry_run,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+One-off migration that adds the int8 embedding copy to existing candidate profiles.
+Writes embedding_int8 / embedding_scale next to embedding_vector so the manual applied
+ranker can score them without decoding the float array; new embeddings get both at write time.
+"""
+import asyncio
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bson import Binary
+from pymongo import AsyncMongoClient, UpdateOne
+
+from app.config.settings import Settings
+from app.utils.logger import setup_logger
+from app.utils.vectors import as_float32, l2_normalize, quantize_int8
+
+logger = setup_logger(__name__, level="INFO")
+
+
+async def quantize_candidate_embeddings(
+    *,
+    batch_size: int = 500,
+    dry_run: bool = False,
+):
+    """
+    Store an int8 copy of every candidate embedding_vector that lacks one.
+
+    Args:
+        batch_size: Number of updates sent per bulk_write
+        dry_run: If True, only count profiles that would be updated
+    """
+    logger.info("=" * 60)
+    logger.info("Candidate Embedding int8 Backfill")
+    logger.info("=" * 60)
+    logger.info("Batch size: %s", batch_size)
+    logger.info("Dry run: %s", dry_run)
+    logger.info("=" * 60)
+
+    settings = Settings()
+    client = AsyncMongoClient(settings.MONGO_URI)
+    collection = client[settings.DATABASE_NAME][settings.USER_PROFILES_COLLECTION]
+
+    updated = 0
+    pending: list[UpdateOne] = []
+
+    try:
+        cursor = collection.find(
+            {
+                "embedding_vector": {"$exists": True, "$ne": []},
+                "$or": [{"embedding_int8": {"$exists": False}}, {"embedding_int8": None}],
+            },
+            {"embedding_vector": 1},
+        )
+        async for doc in cursor:
+            if not doc.get("embedding_vector"):
+                continue
+
+            updated += 1
+            if dry_run:
+                continue
+
+            # The applied ranker treats int8 * scale as a unit vector; quantize the normalized
+            # vector even if normalize_candidate_embeddings.py has not run yet
+            quantized, scale = quantize_int8(l2_normalize(as_float32(doc["embedding_vector"])))
+            pending.append(
+                UpdateOne(
+                    {"_id": doc["_id"]},
+                    {"$set": {"embedding_int8": Binary(quantized), "embedding_scale": scale}},
+                )
+            )
+            if len(pending) >= batch_size:
+                await collection.bulk_write(pending, ordered=False)
+                pending = []
+                logger.info("Progress: %s profiles updated", updated)
+
+        if pending:
+            await collection.bulk_write(pending, ordered=False)
+
+        logger.info("=" * 60)
+        logger.info("INT8 BACKFILL COMPLETE" if not dry_run else "DRY RUN COMPLETE")
+        logger.info("%s: %s", 'Would update' if dry_run else 'Updated', updated)
+        logger.info("=" * 60)
+    finally:
+        await client.close()
+        logger.info("Database connection closed")
+
+
+def main():
+    """Parse arguments and run the migration."""
+    parser = argparse.ArgumentParser(
+        description="Add int8 copies of stored candidate embeddings"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Number of updates per bulk write (default: 500)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Count profiles that need an int8 copy without making changes",
+    )
+
+    args = parser.parse_args()
+
+    asyncio.run(
+        quantize_candidate_embeddings(
+            batch_size=args.batch_size,
+            dry_run=args.dry_run,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()